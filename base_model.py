@@ -4,8 +4,17 @@ Demonstrates: Polymorphism, Encapsulation, Method Overriding
 Author: Team HIT137 - s395508, s395252, s395343, s395499
 """
 
+import hashlib
+import threading
+import time
 from abc import ABC, abstractmethod
 
+from models.inference_backends import apply_backend, default_backend, validate_backend
+from models.result_cache import default_cache
+from models.scheduler import BATCH, INTERACTIVE, ModelScheduler
+from utils.memory import (MemoryBudgetError, available_bytes, format_bytes,
+                          request_budget_bytes, rss_bytes)
+
 class BaseModel(ABC):
     """
     Abstract base class for AI models
@@ -22,6 +31,15 @@ class BaseModel(ABC):
         self.description = description
         self._pipeline = None  # Protected attribute (Encapsulation)
         self.__is_loaded = False  # Private attribute (Encapsulation)
+        self.__cache = default_cache()
+        self.__registry = None
+        self.__backend = default_backend()
+        self.__request_budget = None  # None: the process-wide default
+        self.__source = None  # where the loaded weights came from
+        self.__scheduler = None
+        self.__scheduler_lock = threading.Lock()
+        self.__memory = {"load_rss_delta": None, "load_peak_delta": None,
+                         "last_process_peak": None, "max_process_peak": None}
     
     @abstractmethod
     def process(self, input_data):
@@ -31,14 +49,156 @@ class BaseModel(ABC):
         """
         pass
     
+    @abstractmethod
+    def process_batch(self, inputs, batch_size=32):
+        """
+        Abstract batched counterpart of process()
+        Must return one result per input, in the original input order
+        """
+        pass
+    
     def load_model(self):
         """
         Base load method - can be overridden
         Demonstrates: METHOD OVERRIDING potential
         """
         print(f"Loading {self.model_name}...")
+        if self.__registry is not None:
+            self.__registry.make_room(self)
+        self._check_load_fits()
         self.__is_loaded = True
     
+    def _check_load_fits(self):
+        """Refuse to load weights the system has no free memory for"""
+        needed = getattr(self, "estimated_bytes", 0)
+        available = available_bytes()
+        if available is not None and needed > available:
+            raise MemoryBudgetError(
+                f"Not enough free memory to load {self.model_name}: needs about "
+                f"{format_bytes(needed)}, {format_bytes(available)} available")
+    
+    def _build_pipeline(self):
+        """
+        The task pipeline for hf_model - read from the local snapshot store
+        when it has this model (no network), else via the Hub cache
+        """
+        from models.snapshot_store import load_pipeline, resolve
+        self.__source = resolve(self.hf_model)
+        return load_pipeline(self.task, self.hf_model)
+    
+    def _apply_backend(self):
+        """Swap the freshly loaded fp32 module for the selected backend's"""
+        if self.__backend != "fp32":
+            self._pipeline.model = apply_backend(self._pipeline.model, self.__backend)
+    
+    def get_backend(self):
+        """Getter for the inference backend - ENCAPSULATION"""
+        return self.__backend
+    
+    def set_backend(self, backend):
+        """
+        Select fp32 / int8 / compiled execution
+        A loaded model is unloaded and picks the backend up on next use
+        """
+        validate_backend(backend)
+        if backend != self.__backend and self.__is_loaded:
+            self.unload_model()
+        self.__backend = backend
+    
+    def unload_model(self):
+        """Drop the pipeline so its weights can be garbage collected"""
+        self._pipeline = None
+        self.__is_loaded = False
+    
+    def memory_bytes(self):
+        """
+        Bytes held by the loaded weights (parameters + buffers), or the
+        child class's estimate when nothing is loaded yet
+        """
+        model = getattr(self._pipeline, "model", None)
+        if model is None:
+            return getattr(self, "estimated_bytes", 0)
+        tensors = list(model.parameters()) + list(model.buffers())
+        # int8 Linear layers keep their weights packed, outside parameters()
+        for module in model.modules():
+            if callable(getattr(module, "weight", None)):
+                tensors += [t for t in (module.weight(), module.bias()) if t is not None]
+        return sum(t.numel() * t.element_size() for t in tensors)
+    
+    def get_request_budget(self):
+        """Working-memory budget of one request in bytes (None = unlimited)"""
+        if self.__request_budget is None:
+            return request_budget_bytes()
+        return self.__request_budget or None
+    
+    def set_request_budget(self, budget_bytes):
+        """Per-model budget; 0 = unlimited, None = back to the process default"""
+        self.__request_budget = budget_bytes
+    
+    def fit_batch_size(self, requested, item_bytes):
+        """
+        Largest batch size up to `requested` whose estimated working memory
+        (item_bytes per input) stays within the request budget
+        Raises MemoryBudgetError when not even a single input fits
+        """
+        budget = self.get_request_budget()
+        if budget is None or item_bytes <= 0:
+            return requested
+        fitting = budget // item_bytes
+        if fitting < 1:
+            raise MemoryBudgetError(
+                f"{self.model_name}: one input needs about {format_bytes(item_bytes)} "
+                f"of working memory, over the {format_bytes(budget)} request budget")
+        return max(1, min(requested, fitting))
+    
+    def record_memory(self, phase, probe):
+        """Store a MemoryProbe reading (see memory_decorator)"""
+        if probe.delta_bytes is None:
+            return
+        if phase == "load_model":
+            self.__memory["load_rss_delta"] = probe.delta_bytes
+            self.__memory["load_peak_delta"] = probe.peak_delta_bytes
+        else:
+            self.__memory["last_process_peak"] = probe.peak_delta_bytes
+            self.__memory["max_process_peak"] = max(self.__memory["max_process_peak"] or 0,
+                                                    probe.peak_delta_bytes)
+    
+    def memory_stats(self):
+        """
+        Parameter bytes, RSS growth at load and peaks above the starting
+        RSS of process calls, in bytes (the first model loaded in a process
+        also pays for importing torch and transformers)
+        """
+        stats = {"param_bytes": self.memory_bytes() if self.__is_loaded else 0,
+                 "request_budget": self.get_request_budget(),
+                 "process_rss": rss_bytes()}
+        stats.update(self.__memory)
+        return stats
+    
+    def get_scheduler(self):
+        """This model's job scheduler, started on first use"""
+        with self.__scheduler_lock:
+            if self.__scheduler is None:
+                self.__scheduler = ModelScheduler(self.model_name)
+            return self.__scheduler
+    
+    def submit(self, func, *args, priority=BATCH, timeout=None, key=None, **kwargs):
+        """
+        Run func(*args, **kwargs) on the model's scheduler; returns a Future
+        timeout (seconds) becomes a deadline for the job to start by
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        return self.get_scheduler().submit(func, *args, priority=priority,
+                                           deadline=deadline, key=key, **kwargs)
+    
+    def process_async(self, input_data, priority=INTERACTIVE, timeout=None):
+        """
+        Future of process(input_data); identical inputs already queued or
+        running share one computation
+        """
+        return self.submit(self.process, input_data, priority=priority, timeout=timeout,
+                           key=self.cache_key(input_data, "process"))
+    
     def is_loaded(self):
         """Getter for private attribute - ENCAPSULATION"""
         return self.__is_loaded
@@ -47,11 +207,80 @@ class BaseModel(ABC):
         """Setter for private attribute - ENCAPSULATION"""
         self.__is_loaded = status
     
+    def set_registry(self, registry):
+        """Called by ModelRegistry when it starts sharing this instance"""
+        self.__registry = registry
+    
+    def get_cache(self):
+        """Getter for the result cache - ENCAPSULATION"""
+        return self.__cache
+    
+    def set_cache(self, cache):
+        """Swap the result cache (None disables caching)"""
+        self.__cache = cache
+    
+    def content_key(self, input_data):
+        """
+        Fingerprint of an input's content - overridden by child classes
+        Returning None means the input is never cached
+        """
+        return None
+    
+    def cache_key(self, input_data, namespace="process"):
+        """Content hash combined with the model id and the calling API"""
+        content = self.content_key(input_data)
+        if content is None:
+            return None
+        model_id = getattr(self, "hf_model", self.model_name)
+        if self.__backend != "fp32":  # int8 scores differ slightly from fp32
+            model_id = f"{model_id}@{self.__backend}"
+        digest = hashlib.blake2b(digest_size=20)
+        for part in (model_id, namespace):
+            digest.update(part.encode("utf-8") + b"\0")
+        digest.update(content if isinstance(content, bytes) else content.encode("utf-8"))
+        return digest.hexdigest()
+    
+    def _cached_batch(self, inputs, compute, namespace="batch"):
+        """
+        Serve a batch from the cache and compute only the misses
+        compute(list_of_inputs) must return results in the same order;
+        per-item {"error": ...} results are returned but not cached
+        """
+        inputs = list(inputs)
+        cache = self.__cache
+        if cache is None:
+            return compute(inputs)
+        
+        keys = [self.cache_key(item, namespace) for item in inputs]
+        results = [None] * len(inputs)
+        missing = []
+        for i, key in enumerate(keys):
+            hit = False
+            if key is not None:
+                hit, results[i] = cache.get(key)
+            if not hit:
+                missing.append(i)
+        
+        if missing:
+            computed = compute([inputs[i] for i in missing])
+            for i, result in zip(missing, computed):
+                results[i] = result
+                failed = isinstance(result, dict) and "error" in result
+                if keys[i] is not None and not failed:
+                    cache.put(keys[i], result)
+        return results
+    
     def get_info(self):
         """Return model information"""
         return {
             "name": self.model_name,
             "category": self.category,
             "description": self.description,
-            "loaded": self.__is_loaded
-        }
\ No newline at end of file
+            "loaded": self.__is_loaded,
+            "backend": self.__backend,
+            "loaded_from": self.__source,
+            "memory": self.memory_stats(),
+            "scheduler": self.__scheduler.stats() if self.__scheduler is not None else None,
+            "cache": self.__cache.stats() if self.__cache is not None else None,
+            "registry": self.__registry.stats() if self.__registry is not None else None
+        }
@@ -0,0 +1,242 @@
+"""
+Benchmark Suite - cold start, latency, throughput and memory
+Author: Team HIT137
+
+    python -m benchmarks.run run --output before.json
+    python -m benchmarks.run run --output after.json
+    python -m benchmarks.run compare before.json after.json --threshold 0.10
+    python -m benchmarks.run run --backend int8 --output int8.json
+
+Every scenario runs in a fresh interpreter so import/load times are cold
+and peak RSS belongs to that scenario alone. The tiny random models are
+always benchmarked (fully offline); the real checkpoints are added when
+they are already in the Hugging Face cache (loaded with HF_HUB_OFFLINE=1).
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from models.inference_backends import BACKENDS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REAL_CHECKPOINTS = {"sentiment": "distilbert-base-uncased-finetuned-sst-2-english",
+                    "image": "google/vit-base-patch16-224"}
+# metrics where a bigger number is better; everything else is a cost
+HIGHER_IS_BETTER = ("throughput",)
+
+
+def sample_texts(count, seed=0):
+    """Deterministic review-like sentences of varied length"""
+    from benchmarks.tiny_models import WORDS
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 80)))
+            for _ in range(count)]
+
+
+def sample_images(folder, seed=0):
+    """Deterministic JPEGs from VGA to 12 MP"""
+    import numpy as np
+    from PIL import Image
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i, (width, height) in enumerate([(640, 480), (1280, 960), (1920, 1080), (4000, 3000)]):
+        y, x = np.mgrid[0:height, 0:width]
+        base = np.stack([x * 255 // width, y * 255 // height,
+                         (x + y) * 255 // (width + height)], axis=-1)
+        noise = rng.integers(0, 32, size=(height, width, 3))
+        path = os.path.join(folder, f"sample_{i}.jpg")
+        Image.fromarray((base + noise).clip(0, 255).astype(np.uint8)).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def _check(result):
+    if result.error is not None:
+        raise RuntimeError(result.error)
+    return result
+
+
+def run_scenario(kind, checkpoint, requests, items, batch_sizes, backend="fp32"):
+    """Runs inside the child interpreter; returns a flat dict of metrics"""
+    start = time.perf_counter()
+    if kind == "sentiment":
+        from models.sentiment_model import SentimentModel as model_class
+    else:
+        from models.image_model import ImageClassificationModel as model_class
+    import transformers  # noqa: F401  (the heavy part of a cold start)
+    cold_import = time.perf_counter() - start
+
+    model = model_class()
+    model.hf_model = checkpoint
+    model.set_cache(None)  # measure the model, not the cache
+    model.set_backend(backend)
+    start = time.perf_counter()
+    model.load_model()
+    load = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as folder:
+        inputs = sample_texts(items) if kind == "sentiment" else sample_images(folder)
+        _check(model.process(inputs[0]))  # warm-up
+        latencies = []
+        for i in range(requests):
+            start = time.perf_counter()
+            _check(model.process(inputs[i % len(inputs)]))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        results = {"cold_import_s": cold_import, "load_s": load,
+                   "latency_p50_ms": percentile(latencies, 50),
+                   "latency_p95_ms": percentile(latencies, 95),
+                   "latency_p99_ms": percentile(latencies, 99)}
+        batch_inputs = [inputs[i % len(inputs)] for i in range(items)]
+        for batch_size in batch_sizes:
+            start = time.perf_counter()
+            model.process_batch(batch_inputs, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            results[f"throughput_bs{batch_size}_per_s"] = items / elapsed
+    # the models reset the kernel's high-water mark per call; this is the lifetime peak
+    from utils.memory import peak_rss_bytes
+    results["peak_rss_mb"] = peak_rss_bytes() / (1024 * 1024)
+    return results
+
+
+def scenarios(include_real=True):
+    """(name, kind, checkpoint, env) for every scenario to run"""
+    from benchmarks.tiny_models import ensure_tiny_models
+    tiny = ensure_tiny_models()
+    found = [(f"{kind}/tiny", kind, path, {}) for kind, path in tiny.items()]
+    if include_real:
+        for kind, repo_id in REAL_CHECKPOINTS.items():
+            if is_cached(repo_id):
+                found.append((f"{kind}/real", kind, repo_id, {"HF_HUB_OFFLINE": "1"}))
+    return found
+
+
+def is_cached(repo_id):
+    try:
+        from huggingface_hub import try_to_load_from_cache
+    except ImportError:
+        return False
+    return isinstance(try_to_load_from_cache(repo_id, "config.json"), str)
+
+
+def environment():
+    info = {"python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    for name in ("torch", "transformers", "numpy", "PIL"):
+        try:
+            info[name] = __import__(name).__version__
+        except ImportError:
+            info[name] = None
+    return info
+
+
+def cmd_run(args):
+    results = {}
+    for name, kind, checkpoint, env in scenarios(not args.tiny_only):
+        print(f"▶ {name}", file=sys.stderr, flush=True)
+        command = [sys.executable, "-m", "benchmarks.run", "_scenario", kind, checkpoint,
+                   "--requests", str(args.requests), "--items", str(args.items),
+                   "--batch-sizes", *map(str, args.batch_sizes), "--backend", args.backend]
+        completed = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True,
+                                   env={**os.environ, **env})
+        if completed.returncode != 0:
+            print(completed.stderr[-2000:], file=sys.stderr)
+            results[name] = {"error": completed.stderr.strip().splitlines()[-1:]}
+            continue
+        results[name] = json.loads(completed.stdout.strip().splitlines()[-1])
+        for metric, value in results[name].items():
+            print(f"   {metric:<28} {value:>12.3f}", file=sys.stderr)
+    report = {"environment": environment(), "backend": args.backend, "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_scenario(args):
+    stdout = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):  # keep stdout for the JSON line
+        results = run_scenario(args.kind, args.checkpoint, args.requests,
+                               args.items, args.batch_sizes, args.backend)
+    stdout.write(json.dumps(results) + "\n")
+    return 0
+
+
+def compare(baseline, candidate, threshold):
+    """Yield (scenario, metric, old, new, relative change, regressed)"""
+    for name, old_metrics in baseline["results"].items():
+        new_metrics = candidate["results"].get(name, {})
+        for metric, old in old_metrics.items():
+            new = new_metrics.get(metric)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or not old:
+                continue
+            change = (new - old) / old
+            worse = -change if metric.startswith(HIGHER_IS_BETTER) else change
+            yield name, metric, old, new, change, worse > threshold
+
+
+def cmd_compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+    regressions = 0
+    for name, metric, old, new, change, regressed in compare(baseline, candidate,
+                                                             args.threshold):
+        flag = "REGRESSION" if regressed else ""
+        regressions += regressed
+        print(f"{name:<16} {metric:<28} {old:>12.3f} -> {new:>12.3f} "
+              f"{change * 100:>+7.1f}%  {flag}")
+    print(f"\n{regressions} regression(s) beyond {args.threshold * 100:.0f}%")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HIT137 model benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run every scenario and save JSON")
+    run.add_argument("--output", "-o", default="benchmark.json")
+    run.add_argument("--requests", type=int, default=50, help="single-request samples")
+    run.add_argument("--items", type=int, default=256, help="items per throughput run")
+    run.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    run.add_argument("--tiny-only", action="store_true", help="skip cached real checkpoints")
+    run.add_argument("--backend", choices=BACKENDS, default="fp32")
+    run.set_defaults(func=cmd_run)
+
+    scenario = commands.add_parser("_scenario")  # internal: one child process
+    scenario.add_argument("kind", choices=("sentiment", "image"))
+    scenario.add_argument("checkpoint")
+    scenario.add_argument("--requests", type=int, default=50)
+    scenario.add_argument("--items", type=int, default=256)
+    scenario.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    scenario.add_argument("--backend", choices=BACKENDS, default="fp32")
+    scenario.set_defaults(func=cmd_scenario)
+
+    comp = commands.add_parser("compare", help="flag regressions between two runs")
+    comp.add_argument("baseline")
+    comp.add_argument("candidate")
+    comp.add_argument("--threshold", type=float, default=0.10,
+                      help="relative change counted as a regression (default 0.10)")
+    comp.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
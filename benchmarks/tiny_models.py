@@ -0,0 +1,70 @@
+"""
+Tiny Models - randomly initialised checkpoints for offline benchmarks
+Author: Team HIT137
+
+Same architectures (and pipelines) as the real models, but only a few
+hundred KB, so the benchmark suite runs anywhere without network access.
+"""
+
+import os
+import string
+
+SENTIMENT_LABELS = {0: "NEGATIVE", 1: "POSITIVE"}
+WORDS = ("the a is was movie film good great bad terrible awful love hate "
+         "plot acting boring fun not very really story ending best worst").split()
+
+
+def default_dir():
+    return os.path.join(os.path.expanduser("~"), ".cache", "hit137", "tiny-models")
+
+
+def build_sentiment(path, seed=0):
+    """DistilBERT sequence classifier with a 2-label head and a tiny vocab"""
+    import torch
+    from transformers import (DistilBertConfig, DistilBertForSequenceClassification,
+                              DistilBertTokenizerFast)
+
+    os.makedirs(path, exist_ok=True)
+    vocab = (["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS
+             + list(string.ascii_lowercase + string.digits + string.punctuation)
+             + ["##" + c for c in string.ascii_lowercase + string.digits])
+    vocab_file = os.path.join(path, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab))
+    DistilBertTokenizerFast(vocab_file=vocab_file).save_pretrained(path)
+
+    torch.manual_seed(seed)
+    config = DistilBertConfig(vocab_size=len(vocab), dim=32, hidden_dim=64, n_layers=2,
+                              n_heads=2, max_position_embeddings=512,
+                              id2label=SENTIMENT_LABELS,
+                              label2id={v: k for k, v in SENTIMENT_LABELS.items()})
+    DistilBertForSequenceClassification(config).save_pretrained(path)
+    return path
+
+
+def build_image(path, seed=0, num_labels=1000):
+    """ViT image classifier (224px, 16px patches) with an ImageNet-sized head"""
+    import torch
+    from transformers import ViTConfig, ViTForImageClassification, ViTImageProcessor
+
+    os.makedirs(path, exist_ok=True)
+    torch.manual_seed(seed)
+    labels = {i: f"class_{i}" for i in range(num_labels)}
+    config = ViTConfig(image_size=224, patch_size=16, hidden_size=32, num_hidden_layers=2,
+                       num_attention_heads=2, intermediate_size=64,
+                       id2label=labels, label2id={v: k for k, v in labels.items()})
+    ViTForImageClassification(config).save_pretrained(path)
+    ViTImageProcessor(size={"height": 224, "width": 224}).save_pretrained(path)
+    return path
+
+
+def ensure_tiny_models(root=None):
+    """Build (once) and return {"sentiment": path, "image": path}"""
+    root = root or default_dir()
+    paths = {"sentiment": os.path.join(root, "sentiment"),
+             "image": os.path.join(root, "image")}
+    if not os.path.exists(os.path.join(paths["sentiment"], "config.json")):
+        build_sentiment(paths["sentiment"])
+    if not os.path.exists(os.path.join(paths["image"], "config.json")):
+        build_image(paths["image"])
+    return paths
@@ -0,0 +1,645 @@
+"""
+Headless Command Line Interface
+HIT137 Assignment 3 - AI GUI Application
+
+Runs the models without Tkinter, e.g. on servers or in shell pipelines:
+    cat reviews.txt | python cli.py sentiment > scores.jsonl
+    cat reviews.txt | python cli.py sentiment --replicas 8 > scores.jsonl
+    python cli.py sentiment --input tickets.jsonl --field body --batch-size 64
+    python cli.py sentiment-file export.csv --column review -o scores.jsonl
+    find photos -name '*.jpg' | python cli.py image --threads 8
+    python cli.py classify-dir photos/ --output results.jsonl
+    python cli.py frames clip.gif --stride 2 --top-k 3
+    python cli.py pack-shard photos/ photos.shard
+    python cli.py classify-shard photos.shard --output results.jsonl
+    python cli.py index-dir photos/ && python cli.py similar photos/cat.jpg -k 5
+    python cli.py serve --port 8137
+    python cli.py sentiment --backend int8 --threads 4 --inter-op-threads 1
+    python cli.py classify-dir photos/ --request-budget-mb 256
+    python cli.py parity --model sentiment --backend int8
+    python cli.py snapshot            # then load offline: HF_HUB_OFFLINE=1
+
+Input lines are either raw text/paths or JSON objects; for JSON objects
+the result fields are merged into the object, so ids pass through.
+Results go to stdout as JSONL, one line per input, flushed per batch;
+the throughput/latency summary goes to stderr.
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+
+from models.inference_backends import BACKENDS
+from utils.instrumentation import LatencyHistogram
+from utils.memory import MemoryBudgetError, format_bytes, peak_rss_bytes
+
+
+class RunSummary:
+    """Counts items and times batches for the final stderr report"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.items = 0
+        self.errors = 0
+        self.batches = LatencyHistogram()
+
+    def add_batch(self, size, elapsed_ns):
+        self.items += size
+        self.batches.record(elapsed_ns)
+
+    def report(self, what):
+        elapsed = time.perf_counter() - self.start
+        rate = self.items / elapsed if elapsed else 0.0
+        lines = [f"{self.items} {what} ({self.errors} errors) in {elapsed:.2f} s "
+                 f"- {rate:.1f} {what}/s"]
+        if self.batches.count:
+            stats = self.batches.summary()
+            lines.append(f"batch latency: p50 {stats['p50_ms']:.1f} ms | "
+                         f"p95 {stats['p95_ms']:.1f} ms | p99 {stats['p99_ms']:.1f} ms | "
+                         f"{self.batches.count} batches")
+        lines.append(f"peak RSS: {format_bytes(peak_rss_bytes())}")
+        return "\n".join(lines)
+
+
+def read_records(stream, field):
+    """
+    Lazily parse input lines into (record, value) pairs
+    record is the JSON object (or {"line": n} for raw lines); value is the
+    text/path, or None when the line could not be used (the record then
+    carries an "error")
+    """
+    for number, line in enumerate(stream, 1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        if line.lstrip().startswith("{"):
+            try:
+                record = json.loads(line)
+                value = record[field]
+            except (ValueError, KeyError) as e:
+                yield {"line": number, "error": f"bad input line: {e}"}, None
+                continue
+            if isinstance(value, str) and value.strip():
+                yield record, value
+            else:
+                yield {"line": number,
+                       "error": f"bad input line: {field!r} must be a non-empty string"}, None
+        else:
+            yield {"line": number}, line
+
+
+def batched(iterable, size):
+    """Yield lists of up to size items without reading any further ahead"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def open_input(path):
+    if path in (None, "-"):
+        return contextlib.nullcontext(sys.stdin)
+    return open(path, encoding="utf-8")
+
+
+def open_output(path, stdout):
+    if path in (None, "-"):
+        return contextlib.nullcontext(stdout)
+    return open(path, "w", encoding="utf-8")
+
+
+def set_threads(args):
+    """Pin torch's intra-op/inter-op thread pools, pick the backend and budget"""
+    from models.inference_backends import configure_threads, set_default_backend
+    from utils.memory import set_request_budget
+
+    if args.threads or args.inter_op_threads:
+        configure_threads(args.threads, args.inter_op_threads)
+    if args.backend:
+        set_default_backend(args.backend)
+    if args.request_budget_mb:
+        set_request_budget(args.request_budget_mb * 1024 * 1024)
+
+
+def score_batches(model, batches, args):
+    """
+    Yield (batch, scores) pairs in input order
+    With --replicas the batches run in forked worker processes that share
+    the parent's weights (several batches in flight at once).
+    """
+    def texts(batch):
+        return [value for _, value in batch if value is not None]
+
+    if not args.replicas:
+        for batch in batches:
+            yield batch, model.process_batch(texts(batch), batch_size=args.batch_size)
+        return
+
+    from models.replica_pool import ReplicaPool
+    pending = deque()
+
+    def submitted():
+        for batch in batches:
+            pending.append(batch)
+            yield texts(batch)
+
+    with ReplicaPool(model, workers=args.replicas) as pool:
+        for scores in pool.imap_batches(submitted()):
+            yield pending.popleft(), scores
+
+
+def cmd_sentiment(args, stdout):
+    """Score text lines (or a JSON field) and stream JSONL results"""
+    from models.sentiment_model import SentimentModel
+
+    set_threads(args)
+    model = SentimentModel()
+    model.load_model()
+    summary = RunSummary()
+    with open_input(args.input) as source, open_output(args.output, stdout) as out:
+        batches = batched(read_records(source, args.field), args.batch_size)
+        start = time.perf_counter_ns()
+        for batch, scores in score_batches(model, batches, args):
+            now = time.perf_counter_ns()
+            summary.add_batch(len(scores), now - start)
+            start = now
+            scores = iter(scores)
+            for record, value in batch:
+                if value is None:
+                    summary.errors += 1
+                else:
+                    record.update(next(scores))
+                    if args.echo:
+                        record["text"] = value
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    print(summary.report("texts"), file=sys.stderr)
+    return 0
+
+
+def classify_records(model, records, args, out, summary):
+    """
+    Stream (record, path) pairs through the bulk image classifier
+    Output keeps input order: classify_paths reads paths ahead while
+    prefetching, so bad input lines wait in `order` for the results
+    before them instead of being written as soon as they are read
+    """
+    order = deque()  # [record, ready] for every input line, in input order
+    pending = {}  # path -> entries waiting for its result, in input order
+
+    def paths():
+        for record, value in records:
+            entry = [record, value is None]  # bad lines are ready as they are
+            order.append(entry)
+            if value is None:
+                summary.errors += 1
+                continue
+            pending.setdefault(value, deque()).append(entry)
+            yield value
+
+    def write_ready():
+        while order and order[0][1]:
+            out.write(json.dumps(order.popleft()[0], ensure_ascii=False) + "\n")
+
+    results = model.classify_paths(paths(), batch_size=args.batch_size,
+                                   workers=args.threads or 4)
+    start = time.perf_counter_ns()
+    in_batch = 0
+    write_ready()  # bad lines before the first path
+    for result in results:
+        waiting = pending[result["path"]]
+        entry = waiting.popleft()
+        if not waiting:
+            del pending[result["path"]]
+        entry[0].update(result)
+        entry[1] = True
+        summary.errors += "error" in result
+        write_ready()
+        in_batch += 1
+        if in_batch == args.batch_size:
+            out.flush()
+            now = time.perf_counter_ns()
+            summary.add_batch(in_batch, now - start)
+            start, in_batch = now, 0
+    write_ready()  # bad lines after the last path
+    if in_batch:
+        summary.add_batch(in_batch, time.perf_counter_ns() - start)
+    out.flush()
+
+
+def cmd_sentiment_file(args, stdout):
+    """Score a CSV/text file into an output file, resumably"""
+    from models.sentiment_model import SentimentModel
+
+    set_threads(args)
+    model = SentimentModel()
+    model.load_model()
+    last = [0.0]
+
+    def progress(done, total, rows):
+        now = time.perf_counter()
+        if now - last[0] >= 2.0:
+            last[0] = now
+            print(f"{rows} rows, {done / max(total, 1) * 100:.1f}% of input", file=sys.stderr)
+
+    start = time.perf_counter()
+    state = model.process_file(args.input, args.output, column=args.column,
+                               id_column=args.id_column, fmt=args.format,
+                               batch_size=args.batch_size, resume=not args.restart,
+                               progress=progress)
+    elapsed = time.perf_counter() - start
+    if state["resumed"]:
+        print(f"resumed after row {state['rows'] - state['rows_this_run']}", file=sys.stderr)
+    print(f"{state['rows_this_run']} rows this run ({state['rows']} total, "
+          f"{state['errors']} errors) in {elapsed:.2f} s - "
+          f"{state['rows_this_run'] / elapsed if elapsed else 0.0:.1f} rows/s"
+          f"\npeak RSS: {format_bytes(peak_rss_bytes())}", file=sys.stderr)
+    return 0
+
+
+def cmd_image(args, stdout):
+    """Classify image paths read from a file list/stdin"""
+    from models.image_model import ImageClassificationModel
+
+    set_threads(args)
+    model = ImageClassificationModel()
+    model.load_model()
+    summary = RunSummary()
+    with open_input(args.input) as source, open_output(args.output, stdout) as out:
+        classify_records(model, read_records(source, args.field), args, out, summary)
+    print(summary.report("images"), file=sys.stderr)
+    return 0
+
+
+def cmd_classify_dir(args, stdout):
+    """Classify every image under a folder, one JSON line per image"""
+    from models.image_model import ImageClassificationModel, iter_image_files
+
+    set_threads(args)
+    model = ImageClassificationModel()
+    model.load_model()
+    summary = RunSummary()
+    records = (({}, path) for path in iter_image_files(args.directory,
+                                                       not args.no_recursive))
+    with open_output(args.output, stdout) as out:
+        classify_records(model, records, args, out, summary)
+    print(summary.report("images"), file=sys.stderr)
+    return 0
+
+
+def cmd_frames(args, stdout):
+    """Classify animated GIFs / frame folders, one JSON line per source"""
+    from models.image_model import ImageClassificationModel
+
+    set_threads(args)
+    model = ImageClassificationModel()
+    model.load_model()
+    summary = RunSummary()
+    with open_output(args.output, stdout) as out:
+        for source in args.sources:
+            start = time.perf_counter_ns()
+            try:
+                result = model.classify_frames(
+                    source, stride=args.stride, max_distance=args.max_distance,
+                    max_frames=args.max_frames, batch_size=args.batch_size,
+                    top_k=args.top_k).to_dict()
+            except (OSError, ValueError, MemoryBudgetError) as e:
+                result = {"source": source, "error": str(e)}
+                summary.errors += 1
+            summary.add_batch(len(result.get("frames", ())), time.perf_counter_ns() - start)
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+    print(summary.report("frames"), file=sys.stderr)
+    return 0
+
+
+def cmd_pack_shard(args, stdout):
+    """Decode + resize a folder once into a memory-mapped shard"""
+    from models.image_model import ImageClassificationModel, iter_image_files
+
+    model = ImageClassificationModel()
+    paths = list(iter_image_files(args.directory, not args.no_recursive))
+    start = time.perf_counter()
+
+    def progress(done, total):
+        if done % 256 == 0 or done == total:
+            print(f"packed {done}/{total}", file=sys.stderr)
+
+    count = model.pack_shard(paths, args.shard, workers=args.threads or 4, progress=progress)
+    elapsed = time.perf_counter() - start
+    print(f"{count} images -> {args.shard} in {elapsed:.2f} s", file=sys.stderr)
+    return 0
+
+
+def cmd_classify_shard(args, stdout):
+    """Classify every image of a packed shard without decoding"""
+    from models.image_model import ImageClassificationModel
+    from models.image_shards import ImageShard
+
+    set_threads(args)
+    model = ImageClassificationModel()
+    shard = ImageShard(args.shard)
+    stale = shard.stale()
+    if stale:
+        print(f"⚠️  {len(stale)} images changed since packing (first: {stale[0]})",
+              file=sys.stderr)
+    model.load_model()
+    summary = RunSummary()
+    with open_output(args.output, stdout) as out:
+        batch = []
+        start = time.perf_counter_ns()
+        for result in model.classify_shard(shard, batch_size=args.batch_size):
+            summary.errors += "error" in result
+            batch.append(json.dumps(result, ensure_ascii=False))
+            if len(batch) == args.batch_size:
+                out.write("\n".join(batch) + "\n")
+                out.flush()
+                now = time.perf_counter_ns()
+                summary.add_batch(len(batch), now - start)
+                start, batch = now, []
+        if batch:
+            out.write("\n".join(batch) + "\n")
+            summary.add_batch(len(batch), time.perf_counter_ns() - start)
+    print(summary.report("images"), file=sys.stderr)
+    return 0
+
+
+def cmd_index_dir(args, stdout):
+    """Embed every image under a folder into the similarity index"""
+    from models.embedding_index import IVF_MIN_ROWS, default_index_dir
+    from models.image_model import ImageClassificationModel, iter_image_files
+
+    set_threads(args)
+    model = ImageClassificationModel()
+    try:
+        index = model.open_index(args.index, args.dtype)
+    except ValueError as e:  # built for another model or dtype
+        print(e, file=sys.stderr)
+        return 1
+    paths = list(iter_image_files(args.directory, not args.no_recursive))
+    start = time.perf_counter()
+
+    def progress(done, total):
+        print(f"embedded {done}/{total}", file=sys.stderr)
+
+    added, failed = model.index_paths(paths, index, batch_size=args.batch_size,
+                                      workers=args.threads or 4, progress=progress)
+    if args.ivf or (len(index) >= IVF_MIN_ROWS and not index.has_ivf()):
+        lists = index.build_ivf(args.ivf_lists)
+        print(f"IVF prefilter: {lists} lists", file=sys.stderr)
+    index.save(args.index or default_index_dir(model.hf_model))
+    print(f"{added} embedded, {failed} unreadable, {len(index)} in index "
+          f"({time.perf_counter() - start:.2f} s)", file=sys.stderr)
+    return 0
+
+
+def cmd_similar(args, stdout):
+    """Print the indexed images most similar to each query image"""
+    from models.image_model import ImageClassificationModel
+
+    set_threads(args)
+    model = ImageClassificationModel()
+    try:
+        index = model.open_index(args.index)
+    except ValueError as e:  # built for another model or dtype
+        print(e, file=sys.stderr)
+        return 1
+    if not len(index):
+        print("The similarity index is empty - run index-dir first", file=sys.stderr)
+        return 1
+    queries = [os.path.abspath(path) for path in args.images]
+    vectors = model.embed_batch(queries)
+    for path, vector in zip(queries, vectors):
+        start = time.perf_counter_ns()
+        hits = index.search(vector, k=args.k, exclude=[path], exact=args.exact,
+                            nprobe=args.nprobe)
+        elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+        stdout.write(json.dumps({"path": path, "search_ms": round(elapsed_ms, 3),
+                                 "similar": [{"path": key, "similarity": score}
+                                             for key, score in hits]},
+                                ensure_ascii=False) + "\n")
+    return 0
+
+
+def cmd_serve(args, stdout):
+    """Run the local micro-batching HTTP server until interrupted"""
+    import asyncio
+    from server import serve
+
+    set_threads(args)
+    try:
+        asyncio.run(serve(args.host, args.port, args.models,
+                          args.max_batch_size, args.max_wait_ms, args.backend))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_parity(args, stdout):
+    """Compare a backend with fp32 on the fixed parity samples"""
+    from models.inference_backends import parity_check
+
+    set_threads(args)
+    if args.model == "sentiment":
+        from models.sentiment_model import SentimentModel as model_class
+    else:
+        from models.image_model import ImageClassificationModel as model_class
+    samples = None
+    if args.input:
+        with open_input(args.input) as source:
+            samples = [line.rstrip("\r\n") for line in source if line.strip()]
+    report = parity_check(model_class, args.backend, samples,
+                          max_score_diff=args.max_score_diff)
+    stdout.write(json.dumps(report, indent=2) + "\n")
+    return 0 if report["passed"] else 1
+
+
+def cmd_snapshot(args, stdout):
+    """Write (or list) local snapshots the models load from offline"""
+    from models import snapshot_store
+
+    if args.list:
+        for manifest in snapshot_store.list_snapshots(args.root):
+            stdout.write(json.dumps(manifest) + "\n")
+        return 0
+    classes = {}
+    if "sentiment" in args.models:
+        from models.sentiment_model import SentimentModel
+        classes["sentiment"] = SentimentModel
+    if "image" in args.models:
+        from models.image_model import ImageClassificationModel
+        classes["image"] = ImageClassificationModel
+    for name, model_class in classes.items():
+        model = model_class()
+        start = time.perf_counter()
+        manifest = snapshot_store.create_snapshot(model.hf_model, model.task, args.root)
+        print(f"{name}: {model.hf_model} -> {snapshot_store.snapshot_dir(model.hf_model, args.root)}"
+              f" ({manifest['bytes'] / 2 ** 20:.1f} MB, {time.perf_counter() - start:.1f} s)",
+              file=sys.stderr)
+        stdout.write(json.dumps(manifest) + "\n")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="HIT137 AI models without the GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def runtime(sub, backend=None):
+        sub.add_argument("--backend", choices=BACKENDS, default=backend,
+                         help="fp32 eager, int8 dynamic quantization or torch.compile "
+                              "(default: $HIT137_BACKEND, else fp32)")
+        sub.add_argument("--threads", type=int, default=None,
+                         help="torch intra-op threads (and image decode threads)")
+        sub.add_argument("--inter-op-threads", type=int, default=None,
+                         help="torch inter-op threads")
+        sub.add_argument("--request-budget-mb", type=int, default=None,
+                         help="working memory per request; batches shrink to fit "
+                              "(default: $HIT137_REQUEST_BUDGET_MB)")
+
+    def common(sub, batch_size):
+        sub.add_argument("--output", "-o", help="JSONL output file (default: stdout)")
+        sub.add_argument("--batch-size", type=int, default=batch_size)
+        runtime(sub)
+
+    text = commands.add_parser("sentiment", help="score text lines or JSONL records")
+    text.add_argument("--input", "-i", default="-", help="input file (default: stdin)")
+    text.add_argument("--field", default="text", help="JSON field holding the text")
+    text.add_argument("--echo", action="store_true",
+                      help="copy the input text into each output line")
+    text.add_argument("--replicas", type=int, default=0,
+                      help="score in N forked worker processes sharing one copy "
+                           "of the weights (one torch thread each)")
+    common(text, 32)
+    text.set_defaults(func=cmd_sentiment)
+
+    stream = commands.add_parser("sentiment-file",
+                                 help="score a large CSV/text file with checkpoint/resume")
+    stream.add_argument("input", help="CSV/TSV (by extension) or one text per line")
+    stream.add_argument("--output", "-o", required=True,
+                        help=".jsonl or .csv results; <output>.ckpt holds the checkpoint")
+    stream.add_argument("--column", default="text", help="CSV column holding the text")
+    stream.add_argument("--id-column", default=None, help="CSV column copied into results")
+    stream.add_argument("--format", choices=("csv", "text"), default=None,
+                        help="input format (default: by extension)")
+    stream.add_argument("--restart", action="store_true",
+                        help="ignore the checkpoint and start from the first row")
+    stream.add_argument("--batch-size", type=int, default=32)
+    runtime(stream)
+    stream.set_defaults(func=cmd_sentiment_file)
+
+    image = commands.add_parser("image", help="classify image paths (file list or JSONL)")
+    image.add_argument("--input", "-i", default="-", help="input file (default: stdin)")
+    image.add_argument("--field", default="path", help="JSON field holding the path")
+    common(image, 16)
+    image.set_defaults(func=cmd_image)
+
+    bulk = commands.add_parser("classify-dir", help="classify every image in a folder")
+    bulk.add_argument("directory")
+    bulk.add_argument("--no-recursive", action="store_true")
+    common(bulk, 16)
+    bulk.set_defaults(func=cmd_classify_dir)
+
+    frames = commands.add_parser("frames",
+                                 help="classify animated GIFs or numbered frame folders")
+    frames.add_argument("sources", nargs="+", help="GIF files or frame folders")
+    frames.add_argument("--stride", type=int, default=1, help="sample every Nth frame")
+    frames.add_argument("--max-frames", type=int, default=64,
+                        help="widen the stride so at most this many frames are sampled")
+    frames.add_argument("--max-distance", type=int, default=4,
+                        help="skip frames within this many dHash bits of the last kept one")
+    frames.add_argument("--top-k", type=int, default=5)
+    common(frames, 16)
+    frames.set_defaults(func=cmd_frames)
+
+    pack = commands.add_parser("pack-shard", help="pre-decode a folder into a shard")
+    pack.add_argument("directory")
+    pack.add_argument("shard", help="output shard directory")
+    pack.add_argument("--no-recursive", action="store_true")
+    pack.add_argument("--threads", type=int, default=None, help="decode threads")
+    pack.set_defaults(func=cmd_pack_shard)
+
+    shard = commands.add_parser("classify-shard", help="classify a packed shard")
+    shard.add_argument("shard")
+    common(shard, 32)
+    shard.set_defaults(func=cmd_classify_shard)
+
+    index = commands.add_parser("index-dir", help="add a folder to the similarity index")
+    index.add_argument("directory")
+    index.add_argument("--index", default=None,
+                       help="index directory (default: ~/.cache/hit137/embeddings/<model>)")
+    index.add_argument("--dtype", choices=("float16", "float32"), default=None,
+                       help="vector type of a new index (default: float16; an "
+                            "existing index must match)")
+    index.add_argument("--no-recursive", action="store_true")
+    index.add_argument("--ivf", action="store_true",
+                       help="(re)build the IVF search prefilter (automatic from "
+                            "100000 images)")
+    index.add_argument("--ivf-lists", type=int, default=None,
+                       help="IVF lists (default: square root of the index size)")
+    common(index, 16)
+    index.set_defaults(func=cmd_index_dir)
+
+    similar = commands.add_parser("similar", help="find indexed images similar to these")
+    similar.add_argument("images", nargs="+")
+    similar.add_argument("--index", default=None)
+    similar.add_argument("-k", type=int, default=10)
+    similar.add_argument("--exact", action="store_true",
+                         help="scan every row instead of the IVF prefilter")
+    similar.add_argument("--nprobe", type=int, default=None,
+                         help="IVF lists to score per query (more: slower, better recall)")
+    runtime(similar)
+    similar.set_defaults(func=cmd_similar)
+
+    server = commands.add_parser("serve", help="local HTTP server with micro-batching")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8137)
+    server.add_argument("--models", nargs="+", choices=("sentiment", "image"),
+                        default=["sentiment", "image"])
+    server.add_argument("--max-batch-size", type=int, default=32)
+    server.add_argument("--max-wait-ms", type=float, default=5.0,
+                        help="how long the first request of a batch waits for company")
+    runtime(server)
+    server.set_defaults(func=cmd_serve)
+
+    parity = commands.add_parser("parity", help="check a backend's accuracy against fp32")
+    parity.add_argument("--model", choices=("sentiment", "image"), default="sentiment")
+    parity.add_argument("--input", "-i", default=None,
+                        help="texts or image paths, one per line (default: built-in set)")
+    parity.add_argument("--max-score-diff", type=float, default=0.05)
+    runtime(parity, "int8")
+    parity.set_defaults(func=cmd_parity)
+
+    snapshot = commands.add_parser("snapshot", help="store the models for offline loading")
+    snapshot.add_argument("--models", nargs="+", choices=("sentiment", "image"),
+                          default=["sentiment", "image"])
+    snapshot.add_argument("--root", default=None,
+                          help="snapshot directory (default: $HIT137_SNAPSHOT_DIR or "
+                               "~/.cache/hit137/snapshots)")
+    snapshot.add_argument("--list", action="store_true", help="list existing snapshots")
+    snapshot.set_defaults(func=cmd_snapshot)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # model progress messages go to stderr so stdout stays valid JSONL
+    stdout = sys.stdout
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            return args.func(args, stdout)
+    except BrokenPipeError:
+        # downstream closed the pipe (e.g. `| head`): stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+File Streaming - score huge CSV/text files with checkpoint and resume
+Demonstrates: Generators (lazy pipeline), Encapsulation
+
+    python cli.py sentiment-file reviews.csv -o scores.jsonl --column review
+    # interrupted? run the same command again to continue where it stopped
+
+The input is read as bytes, one record at a time (a CSV record may span
+lines inside quotes), and every record carries the byte offset where the
+next one starts. Results are appended to the output as each batch
+finishes. After each flush the checkpoint "<output>.ckpt" is rewritten
+atomically with the input offset and the output size at that point. On
+resume the output is cut back to that size and reading restarts at that
+offset, so no row is lost or written twice. Only one batch is in memory
+at a time, whatever the file size.
+"""
+
+import csv
+import io
+import json
+import os
+import time
+
+CHECKPOINT_VERSION = 1
+
+
+def detect_format(path):
+    return "csv" if path.lower().endswith((".csv", ".tsv")) else "text"
+
+
+def iter_raw_records(f, quote_aware):
+    """
+    Yield (record bytes, offset after it) from the binary file's current
+    position; with quote_aware a record continues past newlines inside
+    double quotes
+    """
+    offset = f.tell()
+    pending = []
+    quotes = 0
+    for line in f:
+        offset += len(line)
+        if quote_aware:
+            pending.append(line)
+            quotes += line.count(b'"')
+            if quotes % 2:
+                continue  # newline inside a quoted field
+            line = b"".join(pending)
+            pending, quotes = [], 0
+        yield line, offset
+    if pending:
+        yield b"".join(pending), offset  # unbalanced quote at end of file
+
+
+def _decode(raw):
+    return raw.decode("utf-8", errors="replace").rstrip("\r\n")
+
+
+class FileRecords:
+    """
+    Lazy row source over a CSV or plain text file
+    Rows are numbered from 1 (CSV: data rows after the header); rows
+    that cannot be scored come with an error message instead of text
+    """
+
+    def __init__(self, path, fmt=None, column="text", id_column=None, delimiter=None):
+        self.path = path
+        self.format = fmt or detect_format(path)
+        self.column = column
+        self.id_column = id_column
+        self.delimiter = delimiter or ("\t" if path.lower().endswith(".tsv") else ",")
+        self.header = None
+        self.data_start = 0
+        if self.format == "csv":
+            with open(path, "rb") as f:
+                raw, self.data_start = next(iter_raw_records(f, True), (b"", 0))
+            self.header = next(csv.reader([_decode(raw).lstrip("\ufeff")],
+                                          delimiter=self.delimiter), [])
+            if column not in self.header:
+                raise ValueError(f"{path}: no column {column!r} (columns: {self.header})")
+            if id_column is not None and id_column not in self.header:
+                raise ValueError(f"{path}: no id column {id_column!r}")
+
+    def iter_from(self, offset=None, row=0):
+        """Yield (row, id, text, error, offset after the row) from a byte offset"""
+        offset = self.data_start if offset is None else offset
+        text_index = self.header.index(self.column) if self.header else None
+        id_index = self.header.index(self.id_column) if self.id_column else None
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for raw, end in iter_raw_records(f, self.format == "csv"):
+                line = _decode(raw)
+                if not line.strip():
+                    continue
+                row += 1
+                if text_index is None:
+                    yield row, None, line, None, end
+                    continue
+                fields = next(csv.reader([line], delimiter=self.delimiter), [])
+                row_id = None
+                if id_index is not None and id_index < len(fields):
+                    row_id = fields[id_index]
+                if text_index >= len(fields) or not fields[text_index].strip():
+                    yield row, row_id, None, f"no text in column {self.column!r}", end
+                else:
+                    yield row, row_id, fields[text_index], None, end
+
+
+class ResultWriter:
+    """Appends result rows as JSONL or CSV bytes and reports its size"""
+
+    FIELDS = ("row", "id", "label", "score", "error")
+
+    def __init__(self, path, fmt, truncate_to=None):
+        self.format = fmt
+        exists = os.path.exists(path)
+        self.__file = open(path, "r+b" if exists and truncate_to is not None else "wb")
+        if truncate_to is not None and exists:
+            self.__file.truncate(truncate_to)
+            self.__file.seek(truncate_to)
+        if self.format == "csv" and self.__file.tell() == 0:
+            self.__write_csv([self.FIELDS])
+
+    def write(self, results):
+        if self.format == "csv":
+            self.__write_csv([[r.get(field, "") for field in self.FIELDS] for r in results])
+        else:
+            self.__file.write("".join(json.dumps(r, ensure_ascii=False) + "\n"
+                                      for r in results).encode("utf-8"))
+
+    def __write_csv(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        self.__file.write(buffer.getvalue().encode("utf-8"))
+
+    def tell(self):
+        return self.__file.tell()
+
+    def sync(self):
+        """Flush to disk; returns the durable output size"""
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+        return self.__file.tell()
+
+    def close(self):
+        self.__file.close()
+
+
+def checkpoint_path(output_path):
+    return output_path + ".ckpt"
+
+
+def read_checkpoint(output_path):
+    try:
+        with open(checkpoint_path(output_path), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == CHECKPOINT_VERSION else None
+
+
+def write_checkpoint(output_path, state):
+    tmp = checkpoint_path(output_path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, checkpoint_path(output_path))
+
+
+def batched_rows(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_file(score_batch, input_path, output_path, column="text", id_column=None,
+                fmt=None, output_format=None, batch_size=32, resume=True,
+                checkpoint_every_s=5.0, progress=None):
+    """
+    Score every row of input_path into output_path with checkpoints
+    score_batch(texts) -> [{"label", "score"}] in order; progress(done_bytes,
+    total_bytes, rows) may return False to stop early (resumable later).
+    Returns a summary dict
+    """
+    records = FileRecords(input_path, fmt, column, id_column)
+    output_format = output_format or ("csv" if output_path.lower().endswith(".csv")
+                                      else "jsonl")
+    st = os.stat(input_path)
+    identity = {"input": os.path.abspath(input_path), "input_size": st.st_size,
+                "input_mtime_ns": st.st_mtime_ns, "format": records.format,
+                "column": column, "id_column": id_column,
+                "delimiter": records.delimiter, "output_format": output_format}
+    state = read_checkpoint(output_path) if resume else None
+    if state is not None:
+        changed = [k for k, v in identity.items() if state.get(k) != v]
+        if changed:
+            raise ValueError(f"{input_path} or the options changed since the checkpoint "
+                             f"({', '.join(changed)}); delete "
+                             f"{checkpoint_path(output_path)} to start over")
+        if state.get("done"):
+            return dict(state, resumed=True, rows_this_run=0)
+    else:
+        state = dict(identity, version=CHECKPOINT_VERSION, input_offset=None,
+                     output_offset=None, rows=0, errors=0, done=False)
+    resumed = state["input_offset"] is not None
+
+    writer = ResultWriter(output_path, output_format, state["output_offset"])
+    start_rows = state["rows"]
+    last_checkpoint = time.monotonic()
+    written = state["output_offset"]
+    stopped = False
+    try:
+        for batch in batched_rows(records.iter_from(state["input_offset"], state["rows"]),
+                                  batch_size):
+            texts = [text for _, _, text, _, _ in batch if text is not None]
+            scores = iter(score_batch(texts) if texts else ())
+            results = []
+            for row, row_id, text, error, _ in batch:
+                result = {"row": row}
+                if row_id is not None:
+                    result["id"] = row_id
+                if text is None:
+                    result["error"] = error
+                    state["errors"] += 1
+                else:
+                    result.update(next(scores))
+                results.append(result)
+            writer.write(results)
+            state["rows"] = batch[-1][0]
+            state["input_offset"] = batch[-1][4]
+            written = writer.tell()
+
+            if time.monotonic() - last_checkpoint >= checkpoint_every_s:
+                state["output_offset"] = writer.sync()
+                write_checkpoint(output_path, state)
+                last_checkpoint = time.monotonic()
+            if progress is not None and progress(state["input_offset"], st.st_size,
+                                                 state["rows"]) is False:
+                stopped = True
+                break
+        state["done"] = not stopped
+    finally:
+        # an exception leaves the last completed batch checkpointed; bytes
+        # of a half-written batch lie past output_offset and are cut on resume
+        if state["input_offset"] is not None:
+            writer.sync()
+            state["output_offset"] = written
+            write_checkpoint(output_path, state)
+        writer.close()
+    return dict(state, resumed=resumed, rows_this_run=state["rows"] - start_rows)
@@ -0,0 +1,96 @@
+"""
+Frame Sequences - sample animated GIFs and numbered frame folders
+Demonstrates: Generators (frames are decoded one at a time)
+
+    stride = effective_stride(count_frames("clip.gif"), stride=2, max_frames=64)
+    for index, frame, weight in sample_frames("clip.gif", stride):
+        ...
+
+Frames are taken every `stride` frames; effective_stride() widens it
+so long animations are sampled at most `max_frames` times. A sampled
+frame whose 64-bit difference hash (dHash) is within `max_distance`
+bits of the last kept frame is treated as a near-duplicate: it is not
+kept, but adds its weight to that frame for the aggregated scores.
+"""
+
+import math
+import os
+import re
+
+from PIL import Image, ImageSequence
+
+from models.image_model import IMAGE_EXTENSIONS
+
+
+def dhash(image, size=8):
+    """64-bit difference hash: brightness gradients of a 9x8 grayscale thumbnail"""
+    small = image.convert("L").resize((size + 1, size), Image.BILINEAR)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(size):
+        line = pixels[row * (size + 1):(row + 1) * (size + 1)]
+        for left, right in zip(line, line[1:]):
+            bits = (bits << 1) | (right > left)
+    return bits
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part.lower()
+            for part in re.split(r"(\d+)", name)]
+
+
+def frame_files(folder):
+    """Image files of a frame folder in natural order (frame2 before frame10)"""
+    names = [name for name in os.listdir(folder)
+             if name.lower().endswith(IMAGE_EXTENSIONS)
+             and os.path.isfile(os.path.join(folder, name))]
+    return [os.path.join(folder, name) for name in sorted(names, key=_natural_key)]
+
+
+def count_frames(source):
+    if os.path.isdir(source):
+        return len(frame_files(source))
+    with Image.open(source) as image:
+        return getattr(image, "n_frames", 1)
+
+
+def _iter_source(source, stride):
+    """Yield (index, RGB frame) for every stride-th frame"""
+    if os.path.isdir(source):
+        for index, path in enumerate(frame_files(source)):
+            if index % stride == 0:
+                with Image.open(path) as image:
+                    yield index, image.convert("RGB")
+        return
+    with Image.open(source) as image:
+        # frames build on their predecessors, so GIFs are walked in order
+        for index, frame in enumerate(ImageSequence.Iterator(image)):
+            if index % stride == 0:
+                yield index, frame.convert("RGB")
+
+
+def effective_stride(total, stride=1, max_frames=64):
+    """The requested stride, widened to keep at most max_frames samples"""
+    return max(stride, math.ceil(total / max_frames)) if max_frames else stride
+
+
+def sample_frames(source, stride=1, max_distance=4):
+    """
+    Yield (frame index, RGB image, weight) for the kept frames; weight is
+    the number of sampled frames the kept frame stands for
+    """
+    kept = None  # (index, image, hash, weight) waiting for its duplicates
+    for index, frame in _iter_source(source, stride):
+        digest = dhash(frame)
+        if kept is not None and hamming(digest, kept[2]) <= max_distance:
+            kept[3] += 1
+            continue
+        if kept is not None:
+            yield kept[0], kept[1], kept[3]
+        kept = [index, frame, digest, 1]
+    if kept is not None:
+        yield kept[0], kept[1], kept[3]
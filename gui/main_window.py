@@ -4,8 +4,12 @@ Demonstrates: MULTIPLE INHERITANCE, ENCAPSULATION
 Author: Team HIT137
 """
 
+import os
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
+from gui.output_buffer import OutputView
+from gui.thumbnails import ThumbnailLoader, ThumbnailStrip
+from gui.workers import BackgroundRunner
 
 class InputHandler:
     """Mixin class for input handling"""
@@ -16,27 +20,36 @@ class InputHandler:
         self.file_path_var.set("")
 
 class OutputHandler:
-    """Mixin class for output handling"""
+    """Mixin class for output handling (appends go through an OutputView)"""
     def display_output(self, text):
-        self.output_text.config(state=tk.NORMAL)
-        self.output_text.delete("1.0", tk.END)
-        self.output_text.insert("1.0", text)
-        self.output_text.config(state=tk.DISABLED)
+        self.output_view.append(text)
     def clear_output(self):
-        self.output_text.config(state=tk.NORMAL)
-        self.output_text.delete("1.0", tk.END)
-        self.output_text.config(state=tk.DISABLED)
+        self.output_view.clear()
 
 class MainWindow(InputHandler, OutputHandler, tk.Tk):
     """Main Window - DEMONSTRATES MULTIPLE INHERITANCE"""
-    def __init__(self):
+    def __init__(self, prewarm=(), startup_timer=None):
         super().__init__()
         self.__sentiment_model = None
         self.__image_model = None
+        self.__prewarm = tuple(prewarm)
+        self.__startup_timer = startup_timer
+        self.__live_session = None
+        self.__live_after_id = None
+        self.__live_submitted = None
+        self.__live_dirty = False
+        self.__similarity_index = None
+        self.__preview_path = None
         self.title("HIT137 - AI GUI Application")
         self.geometry("1200x850")
         self.configure(bg="#f5f5f5")
+        self._action_buttons = []
+        self._thumbnails = ThumbnailLoader(self)
         self._create_all_widgets()
+        self._runner = BackgroundRunner(self, on_busy_change=self._set_busy,
+                                        quiet_slots=("live", "bulk", "thumbs"))
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.bind("<Map>", self._on_first_map)
     
     def _create_all_widgets(self):
         self._create_menu()
@@ -60,11 +73,14 @@ class MainWindow(InputHandler, OutputHandler, tk.Tk):
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="Clear All", command=self._clear_all)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.quit)
+        file_menu.add_command(label="Exit", command=self._on_close)
         models_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Models", menu=models_menu)
         models_menu.add_command(label="Model 1 Info", command=self._show_model1_info)
         models_menu.add_command(label="Model 2 Info", command=self._show_model2_info)
+        models_menu.add_separator()
+        models_menu.add_command(label="Build Similarity Index...", command=self._index_folder)
+        models_menu.add_command(label="Performance Metrics", command=self._show_metrics)
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
         help_menu.add_command(label="OOP Concepts", command=self._show_oop)
@@ -89,12 +105,14 @@ class MainWindow(InputHandler, OutputHandler, tk.Tk):
                         font=("Arial", 10, "bold"), padx=20, pady=10,
                         relief=tk.RAISED, bd=2, cursor="hand2")
         btn1.pack(side=tk.LEFT, padx=8, expand=True, fill=tk.X)
+        self._action_buttons.append(btn1)
         
         btn2 = tk.Button(frame, text="🖼️ Load Model 2: Image Classification",
                         command=self._load_model2, bg="#27ae60", fg="white",
                         font=("Arial", 10, "bold"), padx=20, pady=10,
                         relief=tk.RAISED, bd=2, cursor="hand2")
         btn2.pack(side=tk.LEFT, padx=8, expand=True, fill=tk.X)
+        self._action_buttons.append(btn2)
     
     def _create_input_section(self, parent):
         frame = tk.LabelFrame(parent, text="User Input Section", 
@@ -121,13 +139,25 @@ class MainWindow(InputHandler, OutputHandler, tk.Tk):
         self.text_frame = tk.Frame(frame, bg="#f5f5f5")
         self.text_frame.pack(fill=tk.BOTH, expand=True)
         
-        tk.Label(self.text_frame, text="Enter Text:", font=("Arial", 9, "bold"),
-                bg="#f5f5f5").pack(anchor=tk.W, pady=(0, 3))
+        label_row = tk.Frame(self.text_frame, bg="#f5f5f5")
+        label_row.pack(fill=tk.X, pady=(0, 3))
+        tk.Label(label_row, text="Enter Text:", font=("Arial", 9, "bold"),
+                bg="#f5f5f5").pack(side=tk.LEFT)
+        self.live_enabled = tk.BooleanVar(value=False)
+        tk.Checkbutton(label_row, text="Live sentiment", variable=self.live_enabled,
+                      bg="#f5f5f5", font=("Arial", 9), cursor="hand2",
+                      command=self._schedule_live).pack(side=tk.RIGHT)
         
         self.text_input = scrolledtext.ScrolledText(self.text_frame, height=8, 
                                                     font=("Arial", 10), wrap=tk.WORD,
                                                     relief=tk.SOLID, bd=1)
         self.text_input.pack(fill=tk.BOTH, expand=True)
+        self.text_input.bind("<KeyRelease>", self._schedule_live)
+        self.text_input.bind("<<Paste>>", self._schedule_live, add="+")
+        
+        self.live_var = tk.StringVar(value="")
+        tk.Label(self.text_frame, textvariable=self.live_var, font=("Arial", 9, "bold"),
+                bg="#f5f5f5", fg="#2c3e50", anchor=tk.W).pack(fill=tk.X, pady=(3, 0))
         
         # Image input
         self.image_frame = tk.Frame(frame, bg="#f5f5f5")
@@ -147,19 +177,47 @@ class MainWindow(InputHandler, OutputHandler, tk.Tk):
                  bg="#95a5a6", fg="white", font=("Arial", 9, "bold"),
                  padx=15, pady=5, relief=tk.RAISED, bd=2, cursor="hand2").pack(side=tk.LEFT)
         
+        tk.Button(file_frame, text="Folder", command=self._browse_folder,
+                 bg="#95a5a6", fg="white", font=("Arial", 9, "bold"),
+                 padx=15, pady=5, relief=tk.RAISED, bd=2, cursor="hand2").pack(
+                     side=tk.LEFT, padx=(5, 0))
+        
+        similar = tk.Button(file_frame, text="Find Similar", command=self._find_similar,
+                           bg="#16a085", fg="white", font=("Arial", 9, "bold"),
+                           padx=15, pady=5, relief=tk.RAISED, bd=2, cursor="hand2")
+        similar.pack(side=tk.LEFT, padx=(5, 0))
+        self._action_buttons.append(similar)
+        
+        # animated GIF / numbered frame folder: sample and classify the frames
+        self.frames_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(file_frame, text="Frames", variable=self.frames_var,
+                      font=("Arial", 9), bg="#f5f5f5").pack(side=tk.LEFT, padx=(5, 0))
+        
+        # preview of the selected image, plus a thumbnail strip for folders;
+        # both are decoded and cached in the background (gui/thumbnails.py)
+        self.preview_label = tk.Label(self.image_frame, text="No image selected",
+                                      font=("Arial", 9), bg="white", fg="#7f8c8d",
+                                      relief=tk.SOLID, bd=1, compound=tk.TOP)
+        self.preview_label.pack(fill=tk.BOTH, expand=True)
+        self.thumbnail_strip = ThumbnailStrip(self.image_frame, self._thumbnails,
+                                              on_select=self._on_thumbnail_select,
+                                              bg="#f5f5f5")  # packed for folders
+        
         # Action buttons
         btn_frame = tk.Frame(frame, bg="#f5f5f5")
         btn_frame.pack(fill=tk.X, pady=(12, 0))
         
-        tk.Button(btn_frame, text="Run Model 1", command=self._run_model1,
-                 bg="#e74c3c", fg="white", font=("Arial", 9, "bold"),
-                 padx=15, pady=8, relief=tk.RAISED, bd=2, cursor="hand2").pack(
-                     side=tk.LEFT, padx=(0, 5), expand=True, fill=tk.X)
+        run1 = tk.Button(btn_frame, text="Run Model 1", command=self._run_model1,
+                        bg="#e74c3c", fg="white", font=("Arial", 9, "bold"),
+                        padx=15, pady=8, relief=tk.RAISED, bd=2, cursor="hand2")
+        run1.pack(side=tk.LEFT, padx=(0, 5), expand=True, fill=tk.X)
+        self._action_buttons.append(run1)
         
-        tk.Button(btn_frame, text="Run Model 2", command=self._run_model2,
-                 bg="#9b59b6", fg="white", font=("Arial", 9, "bold"),
-                 padx=15, pady=8, relief=tk.RAISED, bd=2, cursor="hand2").pack(
-                     side=tk.LEFT, padx=5, expand=True, fill=tk.X)
+        run2 = tk.Button(btn_frame, text="Run Model 2", command=self._run_model2,
+                        bg="#9b59b6", fg="white", font=("Arial", 9, "bold"),
+                        padx=15, pady=8, relief=tk.RAISED, bd=2, cursor="hand2")
+        run2.pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
+        self._action_buttons.append(run2)
         
         tk.Button(btn_frame, text="Clear", command=self._clear_all,
                  bg="#7f8c8d", fg="white", font=("Arial", 9, "bold"),
@@ -180,6 +238,7 @@ class MainWindow(InputHandler, OutputHandler, tk.Tk):
                                                      state=tk.DISABLED, wrap=tk.WORD,
                                                      relief=tk.SOLID, bd=1, bg="white")
         self.output_text.pack(fill=tk.BOTH, expand=True)
+        self.output_view = OutputView(self.output_text)
     
     def _create_info_section(self):
         frame = tk.LabelFrame(self, text="Model Information & OOP Explanation", 
@@ -225,10 +284,100 @@ class MainWindow(InputHandler, OutputHandler, tk.Tk):
                 fg="#666666").pack(anchor=tk.W, pady=(8, 0))
     
     def _create_status(self):
+        status_bar = tk.Frame(self, bd=1, relief=tk.SUNKEN, bg="#ecf0f1")
+        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
         self.status_var = tk.StringVar(value="Ready")
-        status = tk.Label(self, textvariable=self.status_var, bd=1, relief=tk.SUNKEN,
+        status = tk.Label(status_bar, textvariable=self.status_var,
                          anchor=tk.W, font=("Arial", 9), bg="#ecf0f1", fg="#2c3e50")
-        status.pack(side=tk.BOTTOM, fill=tk.X)
+        status.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.progress = ttk.Progressbar(status_bar, mode="indeterminate", length=160)
+        self.progress.pack(side=tk.RIGHT, padx=5, pady=2)
+        self.memory_var = tk.StringVar(value="")
+        tk.Label(status_bar, textvariable=self.memory_var, anchor=tk.E,
+                 font=("Arial", 9), bg="#ecf0f1", fg="#7f8c8d").pack(side=tk.RIGHT, padx=5)
+    
+    def _update_memory(self):
+        """Process RSS plus each loaded model's weights and last request peak"""
+        from utils.memory import format_bytes, rss_bytes
+        parts = [f"RAM {format_bytes(rss_bytes())}"]
+        for name, model in (("M1", self.__sentiment_model), ("M2", self.__image_model)):
+            if model is None or not model.is_loaded():
+                continue
+            stats = model.memory_stats()
+            part = f"{name} {format_bytes(stats['param_bytes'])}"
+            if stats["last_process_peak"] is not None:
+                part += f" (peak +{format_bytes(stats['last_process_peak'])})"
+            parts.append(part)
+        self.memory_var.set(" | ".join(parts))
+    
+    def _set_busy(self, busy):
+        """Disable actions and animate the progress bar while a job runs"""
+        state = tk.DISABLED if busy else tk.NORMAL
+        for button in self._action_buttons:
+            button.config(state=state)
+        if busy:
+            self.progress.config(mode="indeterminate")
+            self.progress.start(16)
+        else:
+            self.progress.stop()
+            self.progress.config(mode="indeterminate", value=0)
+    
+    def _on_progress(self, fraction, text=None):
+        """Switch the progress bar to determinate mode and show progress"""
+        if str(self.progress.cget("mode")) != "determinate":
+            self.progress.stop()
+            self.progress.config(mode="determinate", maximum=1.0)
+        self.progress.config(value=fraction)
+        if text:
+            self.status_var.set(text)
+    
+    def _on_first_map(self, event):
+        if event.widget is not self:
+            return
+        self.unbind("<Map>")
+        # idle callbacks queued now run after the widgets' own redraws
+        self.after_idle(self._on_first_frame)
+    
+    def _on_first_frame(self):
+        """Window is on screen: record it and start any opt-in prewarming"""
+        if self.__startup_timer is not None:
+            self.__startup_timer.mark("first frame drawn")
+            print(self.__startup_timer.report())
+        if "sentiment" in self.__prewarm:
+            self.status_var.set("Prewarming Model 1...")
+            self._runner.submit("model1", self._build_sentiment_model,
+                                on_done=self._on_model1_prewarmed,
+                                on_error=self._on_job_error)
+        if "image" in self.__prewarm:
+            self.status_var.set("Prewarming models...")
+            self._runner.submit("model2", self._build_image_model,
+                                on_done=self._on_model2_prewarmed,
+                                on_error=self._on_job_error)
+    
+    def _on_model1_prewarmed(self, model):
+        self._release_model(self.__sentiment_model)
+        self.__sentiment_model = model
+        self.__live_session = None
+        self.status_var.set("Model 1 ready (prewarmed)")
+        self._update_memory()
+        self._mark_startup("Model 1 prewarmed")
+    
+    def _on_model2_prewarmed(self, model):
+        self._release_model(self.__image_model)
+        self.__image_model = model
+        self.status_var.set("Model 2 ready (prewarmed)")
+        self._update_memory()
+        self._mark_startup("Model 2 prewarmed")
+    
+    def _mark_startup(self, phase):
+        if self.__startup_timer is not None:
+            elapsed = self.__startup_timer.mark(phase)
+            print(f"[startup] {phase}: {elapsed * 1000:.0f} ms")
+    
+    def _on_close(self):
+        self._runner.shutdown()
+        self._thumbnails.shutdown()
+        self.destroy()
     
     def _toggle_input(self):
         if self.input_type.get() == "text":
@@ -244,32 +393,116 @@ class MainWindow(InputHandler, OutputHandler, tk.Tk):
             filetypes=[("Image files", "*.png *.jpg *.jpeg *.bmp *.gif")])
         if filename:
             self.file_path_var.set(filename)
+            self._runner.cancel("thumbs")
+            self.thumbnail_strip.pack_forget()
+            self._show_preview(filename)
+    
+    def _browse_folder(self):
+        folder = filedialog.askdirectory(title="Select Image Folder")
+        if folder:
+            self.file_path_var.set(folder)
+            self.__preview_path = None
+            self.preview_label.config(image="", text="Listing folder...")
+            self._runner.submit("thumbs", self._list_images, folder,
+                                on_done=self._show_thumbnails, on_error=self._on_job_error)
+    
+    PREVIEW_BOX = 256  # preview size in pixels
+    
+    @staticmethod
+    def _list_images(folder):
+        """Runs on a worker thread: the folder's images, as a bulk run sees them"""
+        from models.image_model import iter_image_files
+        return list(iter_image_files(folder))
+    
+    def _show_thumbnails(self, paths):
+        self.thumbnail_strip.set_paths(paths)
+        self.thumbnail_strip.pack(fill=tk.X, pady=(8, 0))
+        if paths:
+            self._show_preview(paths[0])
+        else:
+            self.preview_label.config(image="", text="No images in this folder")
+    
+    def _on_thumbnail_select(self, path, chosen):
+        """Click previews a thumbnail; double-click also makes it the input"""
+        self._show_preview(path)
+        if chosen:
+            self.file_path_var.set(path)
+    
+    def _show_preview(self, path):
+        self.__preview_path = path
+        self.preview_label.config(image="", text="Loading preview...")
+        photo = self._thumbnails.request(path, self.PREVIEW_BOX,
+                                         lambda photo: self._on_preview(path, photo))
+        if photo is not None:
+            self._on_preview(path, photo)
+    
+    def _on_preview(self, path, photo):
+        if path != self.__preview_path:
+            return  # another image was selected meanwhile
+        name = os.path.basename(path)
+        if photo is None:
+            self.preview_label.config(image="", text=f"Cannot preview {name}")
+        else:
+            self.preview_label.config(image=photo, text=name)
+        self.preview_label.image = photo  # Tk does not keep a reference
     
     def _load_model1(self):
         self.status_var.set("Loading Model 1...")
-        self.update()
-        try:
-            from models.sentiment_model import SentimentModel
-            self.__sentiment_model = SentimentModel()
-            self.__sentiment_model.load_model()
-            messagebox.showinfo("Success", "Model 1 loaded successfully!")
-            self.status_var.set("Model 1 loaded")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed: {str(e)}")
-            self.status_var.set("Error")
+        self._runner.submit("model1", self._build_sentiment_model,
+                            on_done=self._on_model1_loaded,
+                            on_error=self._on_job_error)
     
     def _load_model2(self):
         self.status_var.set("Loading Model 2...")
-        self.update()
-        try:
-            from models.image_model import ImageClassificationModel
-            self.__image_model = ImageClassificationModel()
-            self.__image_model.load_model()
-            messagebox.showinfo("Success", "Model 2 loaded successfully!")
-            self.status_var.set("Model 2 loaded")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed: {str(e)}")
-            self.status_var.set("Error")
+        self._runner.submit("model2", self._build_image_model,
+                            on_done=self._on_model2_loaded,
+                            on_error=self._on_job_error)
+    
+    @staticmethod
+    def _build_sentiment_model():
+        """Runs on a worker thread - shared instance from the registry"""
+        from models.model_registry import default_registry
+        from models.sentiment_model import SentimentModel
+        return default_registry().acquire(SentimentModel)
+    
+    @staticmethod
+    def _build_image_model():
+        """Runs on a worker thread - shared instance from the registry"""
+        from models.model_registry import default_registry
+        from models.image_model import ImageClassificationModel
+        return default_registry().acquire(ImageClassificationModel)
+    
+    @staticmethod
+    def _release_model(model):
+        if model is not None:
+            from models.model_registry import default_registry
+            default_registry().release(model)
+    
+    def _on_model1_loaded(self, model):
+        self._release_model(self.__sentiment_model)
+        self.__sentiment_model = model
+        self.__live_session = None
+        self.status_var.set("Model 1 loaded")
+        self._update_memory()
+        messagebox.showinfo("Success", "Model 1 loaded successfully!")
+    
+    def _on_model2_loaded(self, model):
+        self._release_model(self.__image_model)
+        self.__image_model = model
+        self.status_var.set("Model 2 loaded")
+        self._update_memory()
+        messagebox.showinfo("Success", "Model 2 loaded successfully!")
+    
+    def _on_job_error(self, error):
+        self.status_var.set("Error")
+        self._update_memory()
+        messagebox.showerror("Error", f"Failed: {str(error)}")
+    
+    def _on_result(self, result):
+        from models.results import render
+        self.display_output(render(result))
+        self.status_var.set("Completed")
+        self._update_memory()
     
     def _run_model1(self):
         if self.__sentiment_model is None:
@@ -283,10 +516,62 @@ class MainWindow(InputHandler, OutputHandler, tk.Tk):
             messagebox.showwarning("Warning", "Enter text!")
             return
         self.status_var.set("Processing...")
-        self.update()
-        result = self.__sentiment_model.process(text)
-        self.display_output(result)
-        self.status_var.set("Completed")
+        self._runner.watch("run", self.__sentiment_model.process_async(text),
+                           on_done=self._on_result, on_error=self._on_job_error)
+    
+    LIVE_DEBOUNCE_MS = 60
+    
+    def _schedule_live(self, event=None):
+        """Debounce: (re)start the timer on every edit"""
+        if self.__live_after_id is not None:
+            self.after_cancel(self.__live_after_id)
+            self.__live_after_id = None
+        if not self.live_enabled.get():
+            self.live_var.set("")
+            self._runner.cancel("live")
+            return
+        if self.__sentiment_model is None:
+            self.live_var.set("Live: load Model 1 first")
+            return
+        self.__live_after_id = self.after(self.LIVE_DEBOUNCE_MS, self._run_live)
+    
+    def _run_live(self):
+        """
+        Score the current text unless it is unchanged; while a live job is
+        in flight only remember that the text changed, so at most one
+        forward pass runs and the newest text is scored right after it
+        """
+        self.__live_after_id = None
+        text = self.get_text_input()
+        if text == self.__live_submitted:
+            return
+        if self._runner.is_busy("live"):
+            self.__live_dirty = True
+            return
+        if self.__live_session is None:
+            from models.live_sentiment import LiveSentimentSession
+            self.__live_session = LiveSentimentSession(self.__sentiment_model)
+        self.__live_submitted = text
+        self.__live_dirty = False
+        self._runner.submit("live", self.__live_session.score, text,
+                            on_done=self._on_live_result, on_error=self._on_live_error)
+    
+    def _on_live_result(self, result):
+        if result is None:
+            self.live_var.set("")
+        else:
+            mood = "😊" if result["label"] == "POSITIVE" else "😔"
+            self.live_var.set(f"Live: {mood} {result['label']} {result['score'] * 100:.1f}% "
+                              f"({len(result['sentences'])} sentences, "
+                              f"{result['rescored']} re-scored)")
+        if self.__live_dirty:
+            self._run_live()
+    
+    def _on_live_error(self, error):
+        self.live_var.set(f"Live: ❌ {error}")
+        self.__live_submitted = None
+        if self.__live_dirty:
+            self._run_live()
     
     def _run_model2(self):
         if self.__image_model is None:
@@ -300,13 +585,137 @@ class MainWindow(InputHandler, OutputHandler, tk.Tk):
             messagebox.showwarning("Warning", "Select image!")
             return
         self.status_var.set("Processing...")
-        self.update()
-        result = self.__image_model.process(image_path)
-        self.display_output(result)
-        self.status_var.set("Completed")
+        if self.frames_var.get():
+            from models.scheduler import INTERACTIVE
+            model = self.__image_model
+            self._runner.watch("run", model.submit(model.classify_frames, image_path,
+                                                   priority=INTERACTIVE),
+                               on_done=self._on_result, on_error=self._on_job_error)
+            return
+        if os.path.isdir(image_path):
+            # own quiet slot: single-image clicks stay enabled during the run
+            self._runner.submit("bulk", self._classify_folder, self.__image_model,
+                                image_path, on_done=self._on_result,
+                                on_error=self._on_job_error,
+                                on_progress=self._on_progress,
+                                on_item=self.display_output)
+            return
+        self._runner.watch("run", self.__image_model.process_async(image_path),
+                           on_done=self._on_result, on_error=self._on_job_error)
+    
+    @staticmethod
+    def _classify_folder(model, folder, progress, emit):
+        """
+        Runs on a worker thread: bulk-classify a folder, streaming one
+        output line per image and reporting progress. The whole folder is
+        one streaming classify_paths() job on the model's scheduler, so
+        decoding stays ahead of the model; between images the job hands
+        the scheduler to any waiting single-image click
+        """
+        from models.image_model import iter_image_files
+        from models.scheduler import BATCH
+        paths = list(iter_image_files(folder))
+        if not paths:
+            return "No images found in " + folder
+        emit(f"Bulk classification of {folder}")
+        scheduler = model.get_scheduler()
+        
+        def run():
+            errors = 0
+            results = model.classify_paths(paths)
+            try:
+                for done, result in enumerate(results, 1):
+                    name = os.path.relpath(result["path"], folder)
+                    if "error" in result:
+                        errors += 1
+                        line = f"{name}: ❌ {result['error']}"
+                    else:
+                        top = result["predictions"][0]
+                        line = f"{name}: {top['label']} ({top['score'] * 100:.1f}%)"
+                    if not emit(line):
+                        break  # a newer job replaced this one
+                    if done % 16 == 0 or done == len(paths):
+                        progress(done / len(paths), f"Classified {done}/{len(paths)} images")
+                    scheduler.run_higher(BATCH)
+            finally:
+                results.close()
+            return errors
+        
+        errors = model.submit(run, priority=BATCH).result()
+        return f"Done: {len(paths)} images, {errors} errors"
+    
+    def _index_folder(self):
+        if self.__image_model is None:
+            messagebox.showwarning("Warning", "Load Model 2 first!")
+            return
+        folder = filedialog.askdirectory(title="Add Folder to Similarity Index")
+        if not folder:
+            return
+        self.status_var.set("Indexing...")
+        self._runner.submit("run", self._build_index, self.__image_model, folder,
+                            self.__similarity_index, on_done=self._on_index_built,
+                            on_error=self._on_job_error, on_progress=self._on_progress)
+    
+    @staticmethod
+    def _build_index(model, folder, index, progress):
+        """Runs on a worker thread: embed new and changed images, save the index"""
+        from models.embedding_index import IVF_MIN_ROWS, default_index_dir
+        from models.image_model import iter_image_files
+        if index is None:
+            index = model.open_index()
+        added, failed = model.index_paths(
+            list(iter_image_files(folder)), index,
+            progress=lambda done, total: progress(done / total,
+                                                  f"Embedded {done}/{total} images"))
+        if len(index) >= IVF_MIN_ROWS and not index.has_ivf():
+            progress(1.0, "Building the search prefilter...")
+            index.build_ivf()
+        index.save(default_index_dir(model.hf_model))
+        return index, (f"Similarity index: {added} images embedded from {folder}, "
+                       f"{failed} unreadable, {len(index)} in total")
+    
+    def _on_index_built(self, result):
+        self.__similarity_index, summary = result
+        self._on_result(summary)
+    
+    def _find_similar(self):
+        if self.__image_model is None:
+            messagebox.showwarning("Warning", "Load Model 2 first!")
+            return
+        image_path = self.file_path_var.get()
+        if not image_path or not os.path.isfile(image_path):
+            messagebox.showwarning("Warning", "Select an image file!")
+            return
+        self.status_var.set("Searching...")
+        self._runner.submit("run", self._search_similar, self.__image_model, image_path,
+                            self.__similarity_index, on_done=self._on_similar_found,
+                            on_error=self._on_job_error)
+    
+    @staticmethod
+    def _search_similar(model, image_path, index, k=10):
+        """Runs on a worker thread: embed the query and search the index"""
+        import time
+        if index is None:
+            index = model.open_index()
+        if not len(index):
+            return index, "The similarity index is empty - use Models > Build Similarity Index"
+        query = os.path.abspath(image_path)
+        vector = model.embed(query)
+        start = time.perf_counter()
+        hits = index.search(vector, k=k, exclude=[query])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        lines = [f"Images similar to {image_path}",
+                 f"({len(index)} indexed, searched in {elapsed_ms:.1f} ms)", ""]
+        lines += [f"{rank:>2}. {score:.3f}  {path}" for rank, (path, score) in enumerate(hits, 1)]
+        return index, "\n".join(lines)
+    
+    def _on_similar_found(self, result):
+        self.__similarity_index, text = result
+        self._on_result(text)
     
     def _clear_all(self):
         self.clear_inputs()
+        self._schedule_live()
         self.clear_output()
         self.status_var.set("Cleared")
     
@@ -340,6 +749,10 @@ Input: Image files (JPG, PNG, BMP, GIF)
 Output: Top 5 object labels + confidence %"""
         messagebox.showinfo("Model 2 Information", info)
     
+    def _show_metrics(self):
+        from gui.metrics_panel import MetricsPanel
+        MetricsPanel(self)
+    
     def _show_oop(self):
         info = """OOP CONCEPTS IMPLEMENTED:
 
@@ -356,7 +769,7 @@ Output: Top 5 object labels + confidence %"""
    Child classes override parent methods
 
 5. MULTIPLE DECORATORS
-   4 decorators stacked on process()
+   6 decorators stacked on process()
 
 See code for detailed implementation!"""
         messagebox.showinfo("OOP Concepts", info)
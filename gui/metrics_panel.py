@@ -0,0 +1,75 @@
+"""
+Metrics Panel - live view of the instrumentation snapshot
+Author: Team HIT137
+"""
+
+import tkinter as tk
+from tkinter import filedialog, scrolledtext
+
+from utils.instrumentation import metrics
+
+
+class MetricsPanel(tk.Toplevel):
+    """Shows per-model latency percentiles as JSON, refreshed every second"""
+
+    REFRESH_MS = 1000
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Performance Metrics")
+        self.geometry("560x480")
+        self.configure(bg="#f5f5f5")
+
+        controls = tk.Frame(self, bg="#f5f5f5")
+        controls.pack(fill=tk.X, padx=10, pady=8)
+        self.enabled_var = tk.BooleanVar(value=metrics.enabled)
+        tk.Checkbutton(controls, text="Collect metrics", variable=self.enabled_var,
+                       command=self._toggle, bg="#f5f5f5").pack(side=tk.LEFT)
+        tk.Button(controls, text="Reset", command=self._reset).pack(side=tk.RIGHT)
+        tk.Button(controls, text="Export JSON", command=self._export).pack(
+            side=tk.RIGHT, padx=5)
+
+        self.text = scrolledtext.ScrolledText(self, font=("Courier", 9),
+                                              state=tk.DISABLED, bg="white")
+        self.text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self._shown = None
+        self._refresh_id = None
+        self._refresh()
+
+    def destroy(self):
+        if self._refresh_id is not None:
+            self.after_cancel(self._refresh_id)
+            self._refresh_id = None
+        super().destroy()
+
+    def _toggle(self):
+        metrics.enable(self.enabled_var.get())
+        self._show()
+
+    def _reset(self):
+        metrics.reset()
+        self._show()
+
+    def _export(self):
+        filename = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if filename:
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(metrics.to_json())
+
+    def _show(self):
+        """Rewrite the text only when the snapshot changed, keeping the scroll position"""
+        snapshot = metrics.to_json()
+        if snapshot == self._shown:
+            return
+        self._shown = snapshot
+        top = self.text.yview()[0]
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", snapshot)
+        self.text.config(state=tk.DISABLED)
+        self.text.yview_moveto(top)
+
+    def _refresh(self):
+        self._show()
+        self._refresh_id = self.after(self.REFRESH_MS, self._refresh)
@@ -0,0 +1,180 @@
+"""
+Output Buffer - bounded, incremental result display
+Demonstrates: ENCAPSULATION, Composition (OutputView wraps a Text widget)
+Author: Team HIT137
+
+OutputBuffer keeps the newest results in memory and spills older ones to
+a temporary file (with an offset index), so a session can hold any
+number of results in constant memory. OutputView renders the buffer
+into a Text widget: appends are coalesced into one insert per frame,
+only a bounded window of entries stays in the widget, and older entries
+are paged back in when the user scrolls to the top.
+"""
+
+import itertools
+import tempfile
+import tkinter as tk
+from array import array
+from collections import deque
+
+
+class OutputBuffer:
+    """
+    Numbered history of text entries: recent ones in a ring buffer,
+    older ones in a spill file. append() is O(1) whatever the length.
+    """
+
+    def __init__(self, capacity=2000):
+        self.capacity = capacity
+        self.__recent = deque()
+        self.__first = 0              # entry number of __recent[0]
+        self.__spill = None           # temp file, created on first spill
+        self.__spill_size = 0
+        self.__offsets = array("q")   # spill file offset of each old entry
+
+    def __len__(self):
+        return self.__first + len(self.__recent)
+
+    def append(self, text):
+        self.__recent.append(text)
+        if len(self.__recent) > self.capacity:
+            self.__spill_oldest()
+
+    def __spill_oldest(self):
+        data = self.__recent.popleft().encode("utf-8")
+        if self.__spill is None:
+            self.__spill = tempfile.TemporaryFile(prefix="hit137-output-")
+        self.__spill.seek(self.__spill_size)
+        self.__spill.write(data)
+        self.__offsets.append(self.__spill_size)
+        self.__spill_size += len(data)
+        self.__first += 1
+
+    def get(self, start, stop):
+        """Entries start..stop-1 (clamped), read back from disk if spilled"""
+        start, stop = max(0, start), min(stop, len(self))
+        entries = []
+        if start < min(stop, self.__first):
+            end = min(stop, self.__first)
+            bounds = list(self.__offsets[start:end])
+            bounds.append(self.__offsets[end] if end < self.__first else self.__spill_size)
+            self.__spill.seek(bounds[0])
+            data = self.__spill.read(bounds[-1] - bounds[0])
+            entries = [data[a - bounds[0]:b - bounds[0]].decode("utf-8")
+                       for a, b in zip(bounds, bounds[1:])]
+        if stop > self.__first:
+            first = max(start, self.__first) - self.__first
+            entries.extend(itertools.islice(self.__recent, first, stop - self.__first))
+        return entries
+
+    def spilled(self):
+        """Number of entries currently held on disk"""
+        return self.__first
+
+    def clear(self):
+        self.__recent.clear()
+        self.__first = 0
+        self.__offsets = array("q")
+        self.__spill_size = 0
+        if self.__spill is not None:
+            self.__spill.close()
+            self.__spill = None
+
+    close = clear
+
+
+class OutputView:
+    """
+    Incremental renderer for an OutputBuffer in a (Scrolled)Text widget
+
+    The widget always shows a contiguous run of entries ending at the
+    newest one. While the view follows the end, the oldest entries are
+    trimmed beyond max_visible; scrolling to the top pages older entries
+    back in from the buffer.
+    """
+
+    FRAME_MS = 16
+
+    def __init__(self, text, buffer=None, max_visible=500, page=100):
+        self.text = text
+        self.buffer = buffer if buffer is not None else OutputBuffer()
+        self.max_visible = max_visible
+        self.page = page
+        self.__lines = deque()   # line count of each entry in the widget
+        self.__shown_from = 0    # entry number of the first entry shown
+        self.__pending = []
+        self.__flush_id = None
+        self.__page_id = None
+        self.__scrollbar = getattr(text, "vbar", None)
+        text.config(yscrollcommand=self._on_scroll)
+
+    def append(self, entry):
+        """Queue one entry; the widget is updated once per frame"""
+        if not entry.endswith("\n"):
+            entry += "\n"
+        self.buffer.append(entry)
+        self.__pending.append(entry)
+        if self.__flush_id is None:
+            self.__flush_id = self.text.after(self.FRAME_MS, self._flush)
+
+    def clear(self):
+        for after_id in (self.__flush_id, self.__page_id):
+            if after_id is not None:
+                self.text.after_cancel(after_id)
+        self.__flush_id = self.__page_id = None
+        self.__pending = []
+        self.__lines.clear()
+        self.__shown_from = 0
+        self.buffer.clear()
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.config(state=tk.DISABLED)
+
+    def _flush(self):
+        self.__flush_id = None
+        pending, self.__pending = self.__pending, []
+        if not pending:
+            return
+        following = self.text.yview()[1] >= 0.999
+        self.text.config(state=tk.NORMAL)
+        self.text.insert(tk.END, "".join(pending))
+        self.__lines.extend(entry.count("\n") for entry in pending)
+        if following:
+            self._trim()
+            self.text.see(tk.END)
+        self.text.config(state=tk.DISABLED)
+
+    def _trim(self):
+        """Drop the oldest entries from the widget (they stay in the buffer)"""
+        excess = len(self.__lines) - self.max_visible
+        if excess <= 0:
+            return
+        lines = sum(self.__lines.popleft() for _ in range(excess))
+        self.text.delete("1.0", f"{lines + 1}.0")
+        self.__shown_from += excess
+
+    def _on_scroll(self, first, last):
+        if self.__scrollbar is not None:
+            self.__scrollbar.set(first, last)
+        if float(first) <= 0.0 and self.__shown_from > 0 and self.__page_id is None:
+            self.__page_id = self.text.after_idle(self._page_back)
+
+    def _page_back(self):
+        """Insert the previous page of entries above the ones shown"""
+        self.__page_id = None
+        start = max(0, self.__shown_from - self.page)
+        entries = self.buffer.get(start, self.__shown_from)
+        if not entries:
+            return
+        self.text.config(state=tk.NORMAL)
+        self.text.insert("1.0", "".join(entries))
+        self.text.config(state=tk.DISABLED)
+        counts = [entry.count("\n") for entry in entries]
+        self.__lines.extendleft(reversed(counts))
+        self.__shown_from = start
+        # keep the entry the user was looking at in place
+        self.text.yview(f"{sum(counts) + 1}.0")
+
+    def stats(self):
+        return {"entries": len(self.buffer), "spilled": self.buffer.spilled(),
+                "in_widget": len(self.__lines), "first_shown": self.__shown_from}
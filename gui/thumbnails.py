@@ -0,0 +1,328 @@
+"""
+Thumbnails - background-decoded, cached image previews
+Demonstrates: ENCAPSULATION, Composition (ThumbnailStrip draws on a Canvas)
+Author: Team HIT137
+
+Images are never decoded on the Tk thread. A thumbnail is looked up in
+    the Tk-side PhotoImage LRU       ThumbnailLoader, per (path, size)
+    the in-memory PNG LRU            ThumbnailCache, per file hash
+    the disk cache                   ~/.cache/hit137/thumbnails
+                                     (or $HIT137_THUMBNAIL_DIR)
+and only then decoded and downscaled from the file on a worker thread.
+The hash is the SHA-1 of the file bytes, so a copied image reuses its
+thumbnail and an edited one gets a new thumbnail. Workers hand PNG bytes
+back; the Tk thread turns them into PhotoImages. The newest request is
+decoded first, and requests for cells that scrolled out of view are
+cancelled before they are decoded.
+"""
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import queue
+import threading
+import tkinter as tk
+from collections import OrderedDict
+
+logger = logging.getLogger("hit137")
+
+
+def default_thumbnail_dir():
+    return os.environ.get("HIT137_THUMBNAIL_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "hit137", "thumbnails")
+
+
+def render_thumbnail(data, box):
+    """PNG bytes of the encoded image `data` scaled to fit in box x box"""
+    from PIL import Image, ImageOps
+    from utils.memory import MemoryBudgetError, format_bytes, request_budget_bytes
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("RGB", (box, box))  # JPEG: decode at a reduced scale
+        budget = request_budget_bytes()
+        needed = image.width * image.height * 4
+        if budget and needed > budget:
+            raise MemoryBudgetError(f"Image decodes to {image.width}x{image.height} pixels "
+                                    f"and needs about {format_bytes(needed)}")
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        image.thumbnail((box, box), Image.BILINEAR, reducing_gap=2.0)
+        out = io.BytesIO()
+        image.save(out, "PNG", compress_level=1)
+    return out.getvalue()
+
+
+class ThumbnailCache:
+    """
+    Thumbnail PNG bytes keyed by file hash, in memory and on disk
+    Thread-safe; the file is only hashed again when its size or mtime
+    changes. The disk tier is opened on first use, on a worker thread
+    """
+
+    MAX_DIGESTS = 16384
+
+    def __init__(self, disk_dir=None, max_bytes=16 * 1024 * 1024,
+                 max_disk_bytes=256 * 1024 * 1024):
+        from models.result_cache import ResultCache
+        self.disk_dir = disk_dir or default_thumbnail_dir()
+        self.__store = ResultCache(max_bytes=max_bytes, max_disk_bytes=max_disk_bytes)
+        self.__disk_ready = False
+        self.__digests = OrderedDict()  # (path, size, mtime_ns) -> sha1 hex
+        self.__lock = threading.Lock()
+
+    def thumbnail(self, path, box):
+        """PNG bytes of path's thumbnail; raises OSError for unreadable files"""
+        self.__open_disk()
+        st = os.stat(path)
+        file_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        data = None
+        with self.__lock:
+            digest = self.__digests.get(file_key)
+        if digest is None:
+            with open(path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha1(data).hexdigest()
+            with self.__lock:
+                self.__digests[file_key] = digest
+                if len(self.__digests) > self.MAX_DIGESTS:
+                    self.__digests.popitem(last=False)
+        key = f"{digest}-{box}"
+        hit, png = self.__store.get(key)
+        if hit:
+            return png
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        png = render_thumbnail(data, box)
+        self.__store.put(key, png)
+        return png
+
+    def __open_disk(self):
+        with self.__lock:
+            if self.__disk_ready:
+                return
+            self.__disk_ready = True
+        try:
+            self.__store.set_disk_dir(self.disk_dir)
+        except OSError:
+            pass  # read-only home: memory tier only
+
+    def stats(self):
+        return self.__store.stats()
+
+
+class ThumbnailLoader:
+    """
+    Worker pool that turns image paths into PhotoImages for Tk
+    request() returns a cached PhotoImage at once, or None and calls
+    callback(photo) later on the Tk thread (photo is None when the file
+    cannot be shown). Results reach Tk through a queue drained with
+    after(), like BackgroundRunner
+    """
+
+    POLL_MS = 16
+
+    def __init__(self, root, cache=None, workers=2, max_images=512):
+        self._root = root
+        self._cache = cache or ThumbnailCache()
+        self._max_images = max_images
+        self._images = OrderedDict()  # (path, box) -> PhotoImage or None; Tk thread only
+        self._callbacks = {}          # (path, box) -> [callback]; Tk thread only
+        self._pending = OrderedDict()  # keys waiting for a worker, newest last
+        self._cond = threading.Condition()
+        self._results = queue.Queue()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._work, daemon=True,
+                                          name=f"thumbnail-{i}") for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+        self._poll_id = self._root.after(self.POLL_MS, self._poll)
+
+    def request(self, path, box, callback):
+        key = (path, box)
+        if key in self._images:
+            self._images.move_to_end(key)
+            photo = self._images[key]
+            if photo is None:
+                callback(None)  # known to be unreadable
+            return photo
+        self._callbacks.setdefault(key, []).append(callback)
+        with self._cond:
+            self._pending[key] = None
+            self._pending.move_to_end(key)  # re-requested: serve it sooner
+            self._cond.notify()
+        return None
+
+    def cancel(self, path, box):
+        """Forget a request that is no longer needed (e.g. scrolled away)"""
+        key = (path, box)
+        self._callbacks.pop(key, None)
+        with self._cond:
+            self._pending.pop(key, None)
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._cond.notify_all()
+        self._root.after_cancel(self._poll_id)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                key, _ = self._pending.popitem(last=True)
+            try:
+                png = self._cache.thumbnail(*key)
+            except Exception:
+                png = None  # unreadable or not an image
+            self._results.put((key, png))
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    key, png = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    self._deliver(key, png)
+                except Exception:
+                    logger.exception("Thumbnail of %s could not be shown", key[0])
+        finally:
+            if not self._closed:
+                self._poll_id = self._root.after(self.POLL_MS, self._poll)
+
+    def _deliver(self, key, png):
+        photo = None
+        if png is not None:
+            photo = tk.PhotoImage(master=self._root,
+                                   data=base64.b64encode(png).decode("ascii"))
+        self._images[key] = photo
+        if len(self._images) > self._max_images:
+            self._images.popitem(last=False)
+        for callback in self._callbacks.pop(key, ()):
+            callback(photo)
+
+
+class ThumbnailStrip(tk.Frame):
+    """
+    Horizontally scrolling row of thumbnails, usable with thousands of paths
+    Virtualized: canvas items exist only for the cells in view plus
+    MARGIN cells either side. Click previews an image, double-click
+    selects it (on_select(path, chosen))
+    """
+
+    BOX = 72
+    CELL = 80
+    MARGIN = 4
+
+    def __init__(self, master, loader, on_select=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self._loader = loader
+        self._on_select = on_select
+        self._paths = []
+        self._photos = {}  # index -> PhotoImage on the canvas (keeps it alive)
+        self._shown = set()
+        self._requested = set()
+        self._selected = None
+        self._refresh_id = None
+
+        self.canvas = tk.Canvas(self, height=self.CELL, bg="white",
+                                highlightthickness=0, relief=tk.SOLID, bd=1)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.HORIZONTAL, command=self._scroll)
+        self.canvas.configure(xscrollcommand=self._on_xscroll)
+        self.canvas.pack(fill=tk.X)
+        self.scrollbar.pack(fill=tk.X)
+        self.canvas.bind("<Configure>", lambda event: self._schedule_refresh())
+        self.canvas.bind("<Button-1>", lambda event: self._click(event, False))
+        self.canvas.bind("<Double-Button-1>", lambda event: self._click(event, True))
+        self.canvas.bind("<MouseWheel>", lambda event: self._scroll(
+            "scroll", -1 if event.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda event: self._scroll("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self._scroll("scroll", 1, "units"))
+
+    def set_paths(self, paths):
+        for index in list(self._requested):
+            self._loader.cancel(self._paths[index], self.BOX)
+        self._paths = list(paths)
+        self._photos.clear()
+        self._shown.clear()
+        self._requested.clear()
+        self._selected = None
+        self.canvas.delete("all")
+        self.canvas.configure(scrollregion=(0, 0, len(self._paths) * self.CELL, self.CELL),
+                              xscrollincrement=self.CELL)
+        self.canvas.xview_moveto(0)
+        self._schedule_refresh()
+
+    def _scroll(self, *args):
+        self.canvas.xview(*args)
+
+    def _on_xscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        if self._refresh_id is None:
+            self._refresh_id = self.after_idle(self._refresh)
+
+    def _refresh(self):
+        """Draw the cells in view, drop the rest, request missing thumbnails"""
+        self._refresh_id = None
+        left = self.canvas.canvasx(0)
+        first = max(0, int(left // self.CELL) - self.MARGIN)
+        last = min(len(self._paths),
+                   int((left + self.canvas.winfo_width()) // self.CELL) + 1 + self.MARGIN)
+        for index in [i for i in self._shown if not first <= i < last]:
+            self.canvas.delete(f"cell{index}")
+            self._shown.discard(index)
+            self._photos.pop(index, None)
+            if index in self._requested:
+                self._requested.discard(index)
+                self._loader.cancel(self._paths[index], self.BOX)
+        # right to left: the loader serves the newest request first
+        for index in range(last - 1, first - 1, -1):
+            if index in self._shown:
+                continue
+            self._shown.add(index)
+            x = index * self.CELL
+            self.canvas.create_rectangle(x + 2, 2, x + self.CELL - 2, self.CELL - 2,
+                                         outline=self._outline(index), fill="#ecf0f1",
+                                         tags=("cell", f"cell{index}", f"frame{index}"))
+            self._requested.add(index)  # until _show()
+            photo = self._loader.request(self._paths[index], self.BOX,
+                                         lambda photo, index=index: self._show(index, photo))
+            if photo is not None:
+                self._show(index, photo)
+
+    def _show(self, index, photo):
+        self._requested.discard(index)
+        if index not in self._shown:
+            return  # scrolled away meanwhile
+        x = index * self.CELL + self.CELL // 2
+        if photo is None:
+            self.canvas.create_text(x, self.CELL // 2, text="✖", fill="#c0392b",
+                                    tags=("cell", f"cell{index}"))
+            return
+        self._photos[index] = photo
+        self.canvas.create_image(x, self.CELL // 2, image=photo,
+                                 tags=("cell", f"cell{index}"))
+
+    def _outline(self, index):
+        return "#e74c3c" if index == self._selected else "#bdc3c7"
+
+    def _click(self, event, chosen):
+        index = int(self.canvas.canvasx(event.x) // self.CELL)
+        if not 0 <= index < len(self._paths):
+            return
+        previous, self._selected = self._selected, index
+        for i in (previous, index):
+            if i is not None:
+                self.canvas.itemconfigure(f"frame{i}", outline=self._outline(i))
+        if self._on_select is not None:
+            self._on_select(self._paths[index], chosen)
@@ -0,0 +1,183 @@
+"""
+Background Workers - keeps slow model work off the Tk main thread
+Demonstrates: ENCAPSULATION, thread-safe hand-off to the GUI
+Author: Team HIT137
+"""
+
+import itertools
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("hit137")
+
+
+class BackgroundRunner:
+    """
+    Runs jobs on a worker pool and delivers results back to Tk
+
+    Worker threads never touch widgets: they only put messages on a
+    queue, which the Tk thread drains with after() at ~60 fps.
+    Every job belongs to a slot (e.g. "model1"); submitting a new job
+    to a slot cancels the previous one and any late result it produces
+    is dropped as stale. Jobs in quiet slots (e.g. live scoring while
+    typing) do not count as busy.
+    """
+
+    POLL_MS = 16  # ~60 fps
+
+    def __init__(self, root, max_workers=2, on_busy_change=None, quiet_slots=()):
+        self._root = root
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="gui-worker")
+        self._messages = queue.Queue()
+        self._ids = itertools.count(1)
+        self._current = {}   # slot -> id of the latest job
+        self._futures = {}   # slot -> Future of the latest job
+        self._callbacks = {}  # job id -> (on_done, on_error, on_progress, on_item)
+        self._on_busy_change = on_busy_change
+        self._quiet = frozenset(quiet_slots)
+        self._busy = False
+        self._closed = False
+        self._poll_id = self._root.after(self.POLL_MS, self._poll)
+
+    def submit(self, slot, func, *args, on_done=None, on_error=None,
+               on_progress=None, on_item=None, **kwargs):
+        """
+        Run func(*args, **kwargs) on a worker thread
+        If on_progress is given, func also receives a progress(value, text)
+        callable; it returns False once the job has gone stale so long
+        loops can stop early. If on_item is given, func receives an
+        emit(item) callable for streaming partial results to the GUI.
+        """
+        self._forget(slot)
+        job_id = next(self._ids)
+        self._current[slot] = job_id
+        self._callbacks[job_id] = (on_done, on_error, on_progress, on_item)
+
+        if on_progress is not None:
+            def progress(value, text=None):
+                self._messages.put(("progress", slot, job_id, (value, text)))
+                return self.is_current(slot, job_id)
+            kwargs["progress"] = progress
+
+        if on_item is not None:
+            def emit(item):
+                self._messages.put(("item", slot, job_id, item))
+                return self.is_current(slot, job_id)
+            kwargs["emit"] = emit
+
+        def run():
+            if not self.is_current(slot, job_id):
+                self._messages.put(("stale", slot, job_id, None))
+                return
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._messages.put(("error", slot, job_id, e))
+            else:
+                self._messages.put(("done", slot, job_id, result))
+
+        self._futures[slot] = self._executor.submit(run)
+        self._update_busy()
+        return job_id
+
+    def watch(self, slot, future, on_done=None, on_error=None):
+        """
+        Deliver a concurrent.futures.Future (e.g. from model.process_async)
+        through a slot like a submitted job; replacing or cancelling the
+        slot cancels the future if it has not started yet
+        """
+        self._forget(slot)
+        job_id = next(self._ids)
+        self._current[slot] = job_id
+        self._callbacks[job_id] = (on_done, on_error, None, None)
+        self._futures[slot] = future
+
+        def finished(done):
+            if done.cancelled():
+                self._messages.put(("stale", slot, job_id, None))
+            elif done.exception() is not None:
+                self._messages.put(("error", slot, job_id, done.exception()))
+            else:
+                self._messages.put(("done", slot, job_id, done.result()))
+
+        future.add_done_callback(finished)
+        self._update_busy()
+        return job_id
+
+    def cancel(self, slot):
+        """Cancel the job in a slot; a job already running is marked stale"""
+        self._forget(slot)
+        self._update_busy()
+
+    def is_current(self, slot, job_id):
+        """True while job_id is still the latest job in its slot"""
+        return self._current.get(slot) == job_id
+
+    def is_busy(self, slot=None):
+        """True if any job (or the job in the given slot) is in flight"""
+        if slot is not None:
+            return slot in self._current
+        return bool(self._current)
+
+    def shutdown(self):
+        """Stop polling and drop queued jobs"""
+        self._closed = True
+        self._current.clear()
+        self._root.after_cancel(self._poll_id)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _forget(self, slot):
+        job_id = self._current.pop(slot, None)
+        future = self._futures.pop(slot, None)
+        if future is not None and future.cancel():
+            self._callbacks.pop(job_id, None)
+
+    def _poll(self):
+        """
+        Drain finished work without ever blocking the Tk thread
+        A callback that raises is logged; polling always continues
+        """
+        try:
+            while True:
+                try:
+                    kind, slot, job_id, payload = self._messages.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    self._dispatch(kind, slot, job_id, payload)
+                except Exception:
+                    logger.exception("GUI callback for %r (%s) failed", slot, kind)
+        finally:
+            if not self._closed:
+                self._poll_id = self._root.after(self.POLL_MS, self._poll)
+
+    def _dispatch(self, kind, slot, job_id, payload):
+        if kind in ("progress", "item"):
+            callbacks = self._callbacks.get(job_id)
+            if not callbacks or not self.is_current(slot, job_id):
+                return
+            if kind == "progress" and callbacks[2]:
+                callbacks[2](*payload)
+            elif kind == "item" and callbacks[3]:
+                callbacks[3](payload)
+            return
+
+        on_done, on_error, _, _ = self._callbacks.pop(job_id, (None, None, None, None))
+        if not self.is_current(slot, job_id):
+            return  # overtaken by a newer job in the same slot
+        del self._current[slot]
+        self._futures.pop(slot, None)
+        self._update_busy()
+        if kind == "done" and on_done is not None:
+            on_done(payload)
+        elif kind == "error" and on_error is not None:
+            on_error(payload)
+
+    def _update_busy(self):
+        busy = any(slot not in self._quiet for slot in self._current)
+        if busy != self._busy:
+            self._busy = busy
+            if self._on_busy_change is not None:
+                self._on_busy_change(busy)
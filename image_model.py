@@ -3,11 +3,37 @@ Image Classification Model (Model 2)
 Demonstrates: Inheritance, Method Overriding, Multiple Decorators
 """
 
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from models.base_model import BaseModel
+from models.results import ImageResult
 from utils.decorators import (timing_decorator, error_handler_decorator,
-                              logging_decorator, validation_decorator)
-from transformers import pipeline
-from PIL import Image
+                              logging_decorator, validation_decorator,
+                              cache_decorator, memory_decorator, logger)
+from utils.instrumentation import metrics, span
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tif", ".tiff")
+
+def iter_image_files(directory, recursive=True):
+    """Yield image file paths under a directory in a stable (sorted) order"""
+    stack = [directory]
+    while stack:
+        folder = stack.pop()
+        with os.scandir(folder) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        subfolders = []
+        for entry in entries:
+            if entry.is_dir():
+                subfolders.append(entry.path)
+            elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                yield entry.path
+        if recursive:
+            stack.extend(reversed(subfolders))
 
 class ImageClassificationModel(BaseModel):
     """
@@ -15,6 +41,8 @@ class ImageClassificationModel(BaseModel):
     DEMONSTRATES: INHERITANCE, METHOD OVERRIDING, POLYMORPHISM
     """
     
+    result_class = ImageResult
+    
     def __init__(self):
         """Initialize with parent constructor"""
         super().__init__(
@@ -23,7 +51,13 @@ class ImageClassificationModel(BaseModel):
             description="Identifies objects in images"
         )
         self.hf_model = "google/vit-base-patch16-224"
+        self.task = "image-classification"
+        self.estimated_bytes = 346 * 1024 * 1024  # fp32 weights, before loading
+        self._preprocessor = None
+        self._forward_lock = threading.Lock()  # guards the shared batch buffer
+        self.last_timings = {}
     
+    @memory_decorator
     def load_model(self):
         """
         Override parent's load_model
@@ -31,7 +65,13 @@ class ImageClassificationModel(BaseModel):
         """
         super().load_model()
         print(f"Loading image classification pipeline...")
-        self._pipeline = pipeline("image-classification", model=self.hf_model)
+        with span(self.model_name, "load"):
+            from models.image_preprocessing import ImagePreprocessor
+            self._pipeline = self._build_pipeline()
+            self._apply_backend()
+            self._preprocessor = ImagePreprocessor.from_pipeline(
+                self._pipeline, name=self.model_name)
+            self._preprocessor.max_decode_bytes = self.get_request_budget()
         self.set_loaded(True)
         print("✅ Image model ready!")
     
@@ -39,36 +79,427 @@ class ImageClassificationModel(BaseModel):
     @error_handler_decorator
     @logging_decorator
     @validation_decorator
+    @cache_decorator
+    @memory_decorator
     def process(self, input_data):
         """
         Process image - DEMONSTRATES: POLYMORPHISM + MULTIPLE DECORATORS
+        Returns an ImageResult (top 5); call render() for the GUI text
         """
         if not self.is_loaded():
             self.load_model()
         
-        print(f"Classifying image: {input_data}")
-        image = Image.open(input_data)
-        results = self._pipeline(image)
+        logger.debug("Classifying image: %s", input_data)
+        self.fit_batch_size(1, self._activation_bytes())
+        timings = {}
+        array = self._preprocessor.load(input_data, timings)
+        predictions = self._classify_arrays([array], timings)[0]
+        self.last_timings = timings
+        return ImageResult.from_predictions(predictions, path=input_data, timings=timings)
+    
+    @timing_decorator
+    @logging_decorator
+    @memory_decorator
+    def process_batch(self, inputs, batch_size=8):
+        """
+        Classify many image files in batched forward passes
+        Returns the top 5 predictions for each input, in input order; an
+        input that cannot be decoded gets {"error": message} instead
+        """
+        return self._cached_batch(
+            inputs, lambda paths: self._classify_batch(paths, batch_size))
+    
+    def _classify_batch(self, paths, batch_size):
+        """Preprocess and classify fixed-size chunks of image files"""
+        if not self.is_loaded():
+            self.load_model()
         
-        output = """
-╔══════════════════════════════════════╗
-║   IMAGE CLASSIFICATION RESULTS       ║
-╚══════════════════════════════════════╝
-
-Top 5 Predictions:
-
-"""
-        for i, result in enumerate(results[:5], 1):
-            label = result['label']
-            score = result['score'] * 100
-            bar = "█" * int(score / 5)
-            output += f"{i}. {label:.<30} {score:>6.2f}%\n   {bar}\n\n"
+        batch_size = self.fit_batch_size(batch_size, self._activation_bytes())
+        timings = {}
+        results = []
+        for start in range(0, len(paths), batch_size):
+            chunk = paths[start:start + batch_size]
+            chunk_results = [None] * len(chunk)
+            arrays, decoded = [], []
+            for i, path in enumerate(chunk):
+                try:
+                    arrays.append(self._preprocessor.load(path, timings))
+                except Exception as e:  # unreadable or over budget: only this item fails
+                    chunk_results[i] = {"error": str(e)}
+                else:
+                    decoded.append(i)
+            if arrays:
+                for i, top in zip(decoded, self._classify_arrays(arrays, timings)):
+                    chunk_results[i] = top
+            results.extend(chunk_results)
+        self.last_timings = timings
+        return results
+    
+    def _classify_arrays(self, arrays, timings, top_k=5):
+        """Normalize uint8 HWC arrays into the batch buffer and run the ViT"""
+        with self._forward_lock:
+            return self._forward(self._preprocessor.normalize(arrays), timings, top_k)
+    
+    def _forward(self, pixel_values, timings, top_k=5):
+        """
+        One forward pass over a float32 NCHW batch
+        Returns the top_k [{"label", "score"}] for every image
+        """
+        import torch
+        
+        start = time.perf_counter_ns()
+        model = self._pipeline.model
+        with torch.inference_mode():
+            logits = model(pixel_values=torch.from_numpy(pixel_values)).logits
+            scores, indices = logits.softmax(-1).topk(min(top_k, logits.shape[-1]))
+        id2label = model.config.id2label
+        results = [[{"label": id2label[int(i)], "score": float(s)}
+                    for s, i in zip(row_scores, row_indices)]
+                   for row_scores, row_indices in zip(scores.tolist(), indices.tolist())]
+        self._record_forward(start, timings)
+        return results
+    
+    def _probabilities(self, pixel_values, timings):
+        """One forward pass; the full (N, num_labels) float32 softmax"""
+        import torch
         
-        return output
+        start = time.perf_counter_ns()
+        with torch.inference_mode():
+            logits = self._pipeline.model(pixel_values=torch.from_numpy(pixel_values)).logits
+            probabilities = logits.softmax(-1).numpy()
+        self._record_forward(start, timings)
+        return probabilities
+    
+    def _record_forward(self, start, timings):
+        elapsed = time.perf_counter_ns() - start
+        metrics.record_ns(self.model_name, "forward", elapsed)
+        timings["forward_ms"] = timings.get("forward_ms", 0.0) + elapsed / 1e6
+    
+    def _top_k(self, probabilities, top_k=5, **fields):
+        """ImageResult for one row of probabilities"""
+        import numpy as np
+        
+        order = np.argsort(probabilities)[::-1][:top_k]
+        id2label = self._pipeline.model.config.id2label
+        return ImageResult(labels=tuple(id2label[int(i)] for i in order),
+                           scores=probabilities[order].astype(np.float32), **fields)
+    
+    @timing_decorator
+    @logging_decorator
+    @memory_decorator
+    def classify_frames(self, source, stride=1, max_distance=4, max_frames=64,
+                        batch_size=16, top_k=5):
+        """
+        Classify an animated GIF or a folder of numbered frames
+        Every stride-th frame is sampled (the stride grows so at most
+        max_frames are), near-duplicates are skipped (see frame_sequences)
+        and the rest run in batched forward passes. Returns a
+        FrameSequenceResult: top_k per frame, plus the mean probabilities
+        weighted by how many sampled frames each kept frame stands for
+        """
+        import numpy as np
+        from models.frame_sequences import count_frames, effective_stride, sample_frames
+        from models.results import FrameSequenceResult
+        
+        if not self.is_loaded():
+            self.load_model()
+        
+        total = count_frames(source)
+        stride = effective_stride(total, stride, max_frames)
+        batch_size = self.fit_batch_size(batch_size, self._activation_bytes())
+        timings = {}
+        frames, indices, weights = [], [], []
+        summed = None
+        sampled = sample_frames(source, stride, max_distance)
+        while True:
+            start = time.perf_counter_ns()
+            chunk = list(itertools.islice(sampled, batch_size))
+            timings["decode_ms"] = (timings.get("decode_ms", 0.0)
+                                    + (time.perf_counter_ns() - start) / 1e6)
+            if not chunk:
+                break
+            arrays = []
+            for _, image, _ in chunk:
+                start = time.perf_counter_ns()
+                arrays.append(self._preprocessor.resize(image))
+                timings["resize_ms"] = (timings.get("resize_ms", 0.0)
+                                        + (time.perf_counter_ns() - start) / 1e6)
+            with self._forward_lock:
+                probabilities = self._probabilities(self._preprocessor.normalize(arrays),
+                                                    timings)
+            for (index, _, weight), row in zip(chunk, probabilities):
+                frames.append(self._top_k(row, top_k))
+                indices.append(index)
+                weights.append(weight)
+                weighted = row.astype(np.float64) * weight
+                summed = weighted if summed is None else summed + weighted
+        if summed is None:
+            raise ValueError(f"No frames found in {source}")
+        self.last_timings = timings
+        overall = self._top_k(summed / sum(weights), top_k, path=source, timings=timings)
+        return FrameSequenceResult(source=source, total_frames=total, stride=stride,
+                                   duplicates=sum(weights) - len(frames),
+                                   frames=tuple(frames), indices=tuple(indices),
+                                   weights=tuple(weights), overall=overall)
+    
+    def embed(self, input_data):
+        """Pooled ViT features ([CLS] token, float32 vector) for one image"""
+        return self.embed_batch([input_data])[0]
+    
+    def embed_batch(self, inputs, batch_size=16):
+        """(N, hidden_size) float32 embeddings for many images, in input order"""
+        import numpy as np
+        
+        if not self.is_loaded():
+            self.load_model()
+        batch_size = self.fit_batch_size(batch_size, self._activation_bytes())
+        chunks = []
+        for start in range(0, len(inputs), batch_size):
+            arrays = [self._preprocessor.load(item) for item in inputs[start:start + batch_size]]
+            with self._forward_lock:
+                chunks.append(self._embed_pixels(self._preprocessor.normalize(arrays)))
+        if not chunks:
+            return np.empty((0, self.embedding_size()), dtype=np.float32)
+        return np.concatenate(chunks)
+    
+    def embed_paths(self, paths, batch_size=16, workers=4):
+        """
+        Generator over (path, vector) pairs, or (path, None) when the file
+        could not be read; decoding runs on a thread pool
+        """
+        if not self.is_loaded():
+            self.load_model()
+        batch_size = self.fit_batch_size(batch_size, self._activation_bytes())
+        
+        def load(path):
+            try:
+                return self._preprocessor.load(path)
+            except Exception:
+                return None
+        
+        paths = iter(paths)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode") as pool:
+            while True:
+                chunk = list(itertools.islice(paths, batch_size))
+                if not chunk:
+                    return
+                arrays = list(pool.map(load, chunk))
+                good = [array for array in arrays if array is not None]
+                vectors = iter(())
+                if good:
+                    with self._forward_lock:
+                        vectors = iter(self._embed_pixels(self._preprocessor.normalize(good)))
+                for path, array in zip(chunk, arrays):
+                    yield path, (None if array is None else next(vectors))
+    
+    def index_paths(self, paths, index, batch_size=16, workers=4, progress=None):
+        """
+        Embed paths that are new to an EmbeddingIndex or whose file changed
+        since (size or mtime, as in content_key); changed rows are replaced
+        Returns (embedded, failed); progress(done, total) is called per batch
+        """
+        paths = [os.path.abspath(p) for p in paths]
+        stamps = {p: self._file_stamp(p) for p in paths}
+        todo = [p for p in paths if stamps[p] is None or index.stamp(p) != stamps[p]]
+        added = failed = 0
+        keys, vectors = [], []
+        for done, (path, vector) in enumerate(self.embed_paths(todo, batch_size, workers), 1):
+            if vector is None:
+                failed += 1
+            else:
+                keys.append(path)
+                vectors.append(vector)
+            if len(keys) >= batch_size or (done == len(todo) and keys):
+                index.add(keys, vectors, [stamps[key] for key in keys])
+                added += len(keys)
+                keys, vectors = [], []
+            if progress is not None and (done % batch_size == 0 or done == len(todo)):
+                if progress(done, len(todo)) is False:
+                    break
+        return added, failed
+    
+    @staticmethod
+    def _file_stamp(path):
+        """[size, mtime_ns] - the file identity content_key() uses"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+    
+    def open_index(self, path=None, dtype=None):
+        """
+        This model's persistent EmbeddingIndex (empty if none was saved yet)
+        Raises ValueError if the saved index belongs to another model or dtype
+        """
+        from models.embedding_index import EmbeddingIndex, default_index_dir
+        return EmbeddingIndex.open(path or default_index_dir(self.hf_model),
+                                   self.embedding_size(), dtype, model_id=self.hf_model)
+    
+    def embedding_size(self):
+        if not self.is_loaded():
+            self.load_model()
+        return self._pipeline.model.config.hidden_size
+    
+    def _embed_pixels(self, pixel_values):
+        """Final-layer [CLS] features - what the classifier head sees"""
+        import torch
+        
+        model = self._pipeline.model
+        backbone = getattr(model, model.base_model_prefix)
+        with span(self.model_name, "embed"), torch.inference_mode():
+            hidden = backbone(pixel_values=torch.from_numpy(pixel_values)).last_hidden_state
+        return hidden[:, 0].float().numpy().copy()
+    
+    def classify_directory(self, directory, recursive=True, **options):
+        """Bulk mode: classify every image under a folder (see classify_paths)"""
+        return self.classify_paths(iter_image_files(directory, recursive), **options)
+    
+    def classify_paths(self, paths, batch_size=16, workers=4, prefetch=None):
+        """
+        Generator over {"path", "predictions"} (or {"path", "error"}) dicts
+        
+        A thread pool decodes and resizes images ahead of the model while
+        the ViT runs on full batches. At most `prefetch` decoded images
+        are in flight, and nothing more is decoded until the consumer asks
+        for the next result, so memory stays bounded for any folder size.
+        """
+        if not self.is_loaded():
+            self.load_model()
+        batch_size = self.fit_batch_size(batch_size, self._activation_bytes())
+        prefetch = prefetch or batch_size * 2
+        paths = iter(paths)
+        cache = self.get_cache()
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decode")
+        pending = deque()  # (path, cache key, decode future, cached predictions)
+        
+        def fill():
+            while len(pending) < prefetch:
+                path = next(paths, None)
+                if path is None:
+                    return
+                key = self.cache_key(path, "batch") if cache is not None else None
+                hit, predictions = cache.get(key) if key is not None else (False, None)
+                if hit:
+                    pending.append((path, key, None, predictions))
+                else:
+                    future = pool.submit(self._preprocessor.load, path)
+                    pending.append((path, key, future, None))
+        
+        batch = []  # finished decodes and cache hits, in input order
+        try:
+            fill()
+            while pending:
+                path, key, future, cached = pending.popleft()
+                fill()
+                if future is None:
+                    batch.append({"path": path, "predictions": cached})
+                else:
+                    try:
+                        batch.append({"path": path, "key": key, "array": future.result()})
+                    except Exception as e:
+                        batch.append({"path": path, "error": str(e)})
+                if len(batch) >= batch_size:
+                    yield from self._classify_bulk_batch(batch)
+                    batch = []
+            if batch:
+                yield from self._classify_bulk_batch(batch)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _classify_bulk_batch(self, batch):
+        """One forward pass for the decoded entries; yields all entries in order"""
+        todo = [entry for entry in batch if "array" in entry]
+        if todo:
+            predictions = self._classify_arrays([e.pop("array") for e in todo], {})
+            cache = self.get_cache()
+            for entry, top in zip(todo, predictions):
+                key = entry.pop("key")
+                if key is not None and cache is not None:
+                    cache.put(key, top)
+                entry["predictions"] = top
+        yield from batch
+    
+    def get_preprocessor(self):
+        """
+        The decode/resize/normalize stage; available without loading the
+        weights (e.g. for packing shards)
+        """
+        if self._preprocessor is None:
+            from models.image_preprocessing import ImagePreprocessor
+            from models.snapshot_store import resolve
+            self._preprocessor = ImagePreprocessor.from_pretrained(
+                resolve(self.hf_model), name=self.model_name)
+            self._preprocessor.max_decode_bytes = self.get_request_budget()
+        return self._preprocessor
+    
+    def set_request_budget(self, budget_bytes):
+        """Override: the decode limit follows the request budget"""
+        super().set_request_budget(budget_bytes)
+        if self._preprocessor is not None:
+            self._preprocessor.max_decode_bytes = self.get_request_budget()
+    
+    def _activation_bytes(self):
+        """
+        Rough working memory of one image in a forward pass: the uint8
+        and float32 input copies, one layer's attention scores/probabilities
+        over the patch tokens and a handful of hidden-size activations
+        """
+        config = self._pipeline.model.config
+        pixels = self._preprocessor.height * self._preprocessor.width
+        tokens = pixels // (config.patch_size ** 2) + 1
+        return (pixels * 3 * 5
+                + 4 * tokens * (2 * config.num_attention_heads * tokens + 10 * config.hidden_size))
+    
+    def pack_shard(self, paths, shard_dir, workers=4, progress=None):
+        """Pre-decode images into a memory-mapped shard (see image_shards)"""
+        from models.image_shards import pack_shard
+        return pack_shard(paths, shard_dir, self.get_preprocessor(), workers=workers,
+                          model_id=self.hf_model, progress=progress)
+    
+    def classify_shard(self, shard, batch_size=32):
+        """
+        Generator over {"path", "predictions"} (or {"path", "error"}) dicts
+        for a packed ImageShard (or shard directory): no decoding, the
+        memory-mapped uint8 batches are normalized straight into the
+        model's input buffer
+        """
+        from models.image_shards import ImageShard
+        if not isinstance(shard, ImageShard):
+            shard = ImageShard(shard)
+        if not self.is_loaded():
+            self.load_model()
+        packed = (shard.settings["height"], shard.settings["width"])
+        needed = (self._preprocessor.height, self._preprocessor.width)
+        if packed != needed:
+            raise ValueError(f"Shard images are {packed[0]}x{packed[1]}, "
+                             f"the model needs {needed[0]}x{needed[1]}")
+        batch_size = self.fit_batch_size(batch_size, self._activation_bytes())
+        for entries, images in shard.batches(batch_size):
+            timings = {}
+            with self._forward_lock:
+                with span(self.model_name, "normalize"):
+                    pixel_values = self._preprocessor.normalize_uint8(images)
+                predictions = self._forward(pixel_values, timings)
+            for entry, top in zip(entries, predictions):
+                if "error" in entry:
+                    yield {"path": entry["path"], "error": entry["error"]}
+                else:
+                    yield {"path": entry["path"], "predictions": top}
+    
+    def content_key(self, input_data):
+        """Cache key content: (path, size, mtime) - no need to read the file"""
+        try:
+            path = os.path.abspath(input_data)
+            st = os.stat(path)
+        except (OSError, TypeError, ValueError):
+            return None
+        return f"{path}\0{st.st_size}\0{st.st_mtime_ns}"
     
     def get_info(self):
         """Override for specific info - METHOD OVERRIDING"""
         info = super().get_info()
         info["huggingface_model"] = self.hf_model
         info["input_type"] = "Image"
+        info["last_timings"] = dict(self.last_timings)
         return info
\ No newline at end of file
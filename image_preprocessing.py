@@ -0,0 +1,141 @@
+"""
+Image Preprocessing - fast decode/resize/normalize stage for the ViT model
+Demonstrates: Encapsulation (reusable private batch buffer)
+"""
+
+import time
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from utils.instrumentation import metrics
+from utils.memory import MemoryBudgetError, format_bytes
+
+
+class ImagePreprocessor:
+    """
+    Turns image files into a normalized float32 NCHW batch
+
+    - decode: JPEG draft mode lets libjpeg decode at 1/2, 1/4 or 1/8 scale,
+      so a 24 MP photo is never fully decoded; EXIF orientation and colour
+      mode are fixed once on the reduced image; images that would still
+      need more than max_decode_bytes are refused before decoding
+    - resize: one PIL resize to the model size (same filter as the HF
+      image processor) into a uint8 HWC array
+    - normalize: a single vectorized NumPy pass writes the whole batch into
+      a preallocated float32 buffer that is reused between calls
+    """
+
+    def __init__(self, size=(224, 224), mean=(0.5, 0.5, 0.5), std=(0.5, 0.5, 0.5),
+                 rescale_factor=1 / 255, resample=Image.BILINEAR, name="image"):
+        self.name = name  # owner shown in the metrics snapshot
+        self.max_decode_bytes = None  # None = unlimited
+        self.height, self.width = size
+        self.resample = resample
+        mean = np.asarray(mean, dtype=np.float32).reshape(1, 3, 1, 1)
+        std = np.asarray(std, dtype=np.float32).reshape(1, 3, 1, 1)
+        # (x * rescale - mean) / std  ==  x * scale - offset
+        self.__scale = (rescale_factor / std).astype(np.float32)
+        self.__offset = (mean / std).astype(np.float32)
+        self.__buffer = np.empty((0, 3, self.height, self.width), dtype=np.float32)
+        self.__staging = np.empty((0, self.height, self.width, 3), dtype=np.uint8)
+
+    @classmethod
+    def from_pipeline(cls, pipeline, name="image"):
+        """Copy size/mean/std/resample from a transformers image pipeline"""
+        return cls.from_processor(pipeline.image_processor, name=name)
+
+    @classmethod
+    def from_pretrained(cls, model_id, name="image"):
+        """Same settings without loading the model weights"""
+        from transformers import AutoImageProcessor
+        return cls.from_processor(AutoImageProcessor.from_pretrained(model_id), name=name)
+
+    @classmethod
+    def from_processor(cls, processor, name="image"):
+        """Copy size/mean/std/resample from a transformers image processor"""
+        size = getattr(processor, "size", None) or {}
+        height = size.get("height") or size.get("shortest_edge", 224)
+        width = size.get("width") or size.get("shortest_edge", 224)
+        resample = getattr(processor, "resample", None)
+        return cls(size=(height, width),
+                   mean=getattr(processor, "image_mean", None) or (0.5, 0.5, 0.5),
+                   std=getattr(processor, "image_std", None) or (0.5, 0.5, 0.5),
+                   rescale_factor=getattr(processor, "rescale_factor", 1 / 255),
+                   resample=int(resample) if resample is not None else Image.BILINEAR,
+                   name=name)
+
+    def settings(self):
+        """What decode + resize depend on (stored with pre-resized shards)"""
+        return {"height": self.height, "width": self.width, "resample": int(self.resample)}
+
+    def decode(self, source):
+        """Open a path/file object (or take a PIL image) as an upright RGB image"""
+        if isinstance(source, Image.Image):
+            image = ImageOps.exif_transpose(source)
+        else:
+            with Image.open(source) as image:
+                # no-op for non-JPEG; otherwise decodes at the smallest
+                # DCT scale that still covers the target size
+                image.draft("RGB", (self.width, self.height))
+                self._check_decode_size(image)
+                image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return image
+
+    def _check_decode_size(self, image):
+        """Header-only check: the RGB decode plus the upright copy must fit"""
+        if self.max_decode_bytes is None:
+            return
+        width, height = image.size  # already the reduced size after draft()
+        needed = width * height * 3 * 2
+        if needed > self.max_decode_bytes:
+            raise MemoryBudgetError(
+                f"Image decodes to {width}x{height} pixels and needs about "
+                f"{format_bytes(needed)}, over the {format_bytes(self.max_decode_bytes)} "
+                f"request budget - downscale it first")
+
+    def resize(self, image):
+        """Resize straight to the model input size as a uint8 HWC array"""
+        if image.size != (self.width, self.height):
+            image = image.resize((self.width, self.height), self.resample,
+                                 reducing_gap=3.0)
+        return np.asarray(image, dtype=np.uint8)
+
+    def load(self, source, timings=None):
+        """decode + resize one image, adding the time spent to timings"""
+        start = time.perf_counter_ns()
+        image = self.decode(source)
+        decoded = time.perf_counter_ns()
+        array = self.resize(image)
+        resized = time.perf_counter_ns()
+        metrics.record_ns(self.name, "decode", decoded - start)
+        metrics.record_ns(self.name, "resize", resized - decoded)
+        if timings is not None:
+            timings["decode_ms"] = timings.get("decode_ms", 0.0) + (decoded - start) / 1e6
+            timings["resize_ms"] = timings.get("resize_ms", 0.0) + (resized - decoded) / 1e6
+        return array
+
+    def normalize(self, arrays):
+        """
+        Normalize uint8 HWC arrays into the reusable float32 NCHW buffer
+        The returned view is only valid until the next call
+        """
+        count = len(arrays)
+        if count > len(self.__staging):
+            self.__staging = np.empty((count, self.height, self.width, 3), dtype=np.uint8)
+        staging = self.__staging[:count]
+        for i, array in enumerate(arrays):
+            staging[i] = array
+        return self.normalize_uint8(staging)
+
+    def normalize_uint8(self, batch):
+        """Normalize an (N, H, W, 3) uint8 array into the reusable buffer"""
+        count = len(batch)
+        if count > len(self.__buffer):
+            self.__buffer = np.empty((count, 3, self.height, self.width), dtype=np.float32)
+        out = self.__buffer[:count]
+        np.multiply(batch.transpose(0, 3, 1, 2), self.__scale, out=out)
+        np.subtract(out, self.__offset, out=out)
+        return out
@@ -0,0 +1,137 @@
+"""
+Image Shards - pre-decoded, memory-mapped image corpora
+Demonstrates: Encapsulation (the shard hides its on-disk layout)
+
+    python cli.py pack-shard photos/ photos.shard
+    python cli.py classify-shard photos.shard --batch-size 32
+
+A shard is a directory with
+    images.npy   (N, H, W, 3) uint8, already decoded and resized
+    index.json   one entry per image: path, sha1, size, mtime_ns (or error)
+                 plus the preprocessing settings the images were made with
+
+Packing pays the JPEG/PNG decode + resize once; later runs memory-map
+images.npy and hand zero-copy batch views straight to normalization, so
+repeat runs are bound by the model rather than by decoding.
+"""
+
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SHARD_VERSION = 1
+IMAGES_FILE = "images.npy"
+INDEX_FILE = "index.json"
+
+
+def _read_one(preprocessor, path):
+    """Decode/resize one file and fingerprint it"""
+    array = preprocessor.resize(preprocessor.decode(path))
+    with open(path, "rb") as f:  # just decoded: served from the page cache
+        sha1 = hashlib.sha1(f.read()).hexdigest()
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "sha1": sha1,
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns}, array
+
+
+def pack_shard(paths, shard_dir, preprocessor, workers=4, model_id=None, progress=None):
+    """
+    Decode and resize every image once into a new shard; returns the
+    number of images packed (unreadable files are kept as error entries)
+    """
+    paths = list(paths)
+    os.makedirs(shard_dir, exist_ok=True)
+    try:
+        # repacking: the old index must not pair with the new pixels
+        os.remove(os.path.join(shard_dir, INDEX_FILE))
+    except FileNotFoundError:
+        pass
+    shape = (len(paths), preprocessor.height, preprocessor.width, 3)
+    images = np.lib.format.open_memmap(os.path.join(shard_dir, IMAGES_FILE),
+                                       mode="w+", dtype=np.uint8, shape=shape)
+    entries = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pack") as pool:
+        pending = deque()  # bounded look-ahead keeps memory flat
+        queued = iter(paths)
+        for _ in range(workers * 4):
+            path = next(queued, None)
+            if path is not None:
+                pending.append((path, pool.submit(_read_one, preprocessor, path)))
+        while pending:
+            path, future = pending.popleft()
+            following = next(queued, None)
+            if following is not None:
+                pending.append((following, pool.submit(_read_one, preprocessor, following)))
+            try:
+                entry, array = future.result()
+                images[len(entries)] = array
+            except Exception as e:
+                entry = {"path": os.path.abspath(path), "error": str(e)}
+            entries.append(entry)
+            if progress is not None:
+                progress(len(entries), len(paths))
+    images.flush()
+    del images
+
+    index = {"version": SHARD_VERSION, "count": len(entries), "model": model_id,
+             "preprocessing": preprocessor.settings(), "entries": entries}
+    tmp = os.path.join(shard_dir, INDEX_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp, os.path.join(shard_dir, INDEX_FILE))  # index last = shard complete
+    return len(entries)
+
+
+class ImageShard:
+    """Read-only view of a packed shard"""
+
+    def __init__(self, shard_dir):
+        self.shard_dir = shard_dir
+        with open(os.path.join(shard_dir, INDEX_FILE), encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != SHARD_VERSION:
+            raise ValueError(f"Unsupported shard version {index.get('version')}")
+        self.__index = index
+        self.__images = np.load(os.path.join(shard_dir, IMAGES_FILE), mmap_mode="r")
+
+    def __len__(self):
+        return self.__index["count"]
+
+    @property
+    def entries(self):
+        return self.__index["entries"]
+
+    @property
+    def settings(self):
+        """Preprocessing settings the images were packed with"""
+        return self.__index["preprocessing"]
+
+    @property
+    def images(self):
+        """The (N, H, W, 3) uint8 memmap"""
+        return self.__images
+
+    def batches(self, batch_size=32):
+        """Yield (entries, uint8 view) pairs; the views are zero-copy slices"""
+        for start in range(0, len(self), batch_size):
+            stop = min(start + batch_size, len(self))
+            yield self.entries[start:stop], self.__images[start:stop]
+
+    def stale(self):
+        """Paths whose file changed size/mtime (or vanished) since packing"""
+        changed = []
+        for entry in self.entries:
+            if "error" in entry:
+                continue
+            try:
+                st = os.stat(entry["path"])
+            except OSError:
+                changed.append(entry["path"])
+                continue
+            if st.st_size != entry["size"] or st.st_mtime_ns != entry["mtime_ns"]:
+                changed.append(entry["path"])
+        return changed
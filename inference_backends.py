@@ -0,0 +1,156 @@
+"""
+Inference Backends - CPU execution modes for the transformer models
+Demonstrates: Strategy pattern (one loaded pipeline, swappable execution)
+
+    fp32      eager PyTorch, the reference
+    int8      dynamic quantization of every nn.Linear (weights int8,
+              activations quantized on the fly) - typically 2-3x faster on
+              CPU for the attention/MLP heavy DistilBERT and ViT
+    compiled  torch.compile of the model's forward (first call compiles)
+
+parity_check() compares a backend with fp32 on a fixed sample set before
+it is trusted; the default backend comes from $HIT137_BACKEND.
+"""
+
+import os
+import tempfile
+import time
+import warnings
+
+BACKENDS = ("fp32", "int8", "compiled")
+
+PARITY_TEXTS = (
+    "I absolutely loved this movie, the acting was superb.",
+    "The worst meal I have had in years. Never again.",
+    "It was fine, nothing special but not bad either.",
+    "Customer support resolved my issue in five minutes - impressive!",
+    "The battery died after two days and the seller ignored my emails.",
+    "A slow start, but the final act is genuinely moving.",
+    "I can't recommend this hotel enough; spotless rooms and friendly staff.",
+    "Broken on arrival. Packaging was soaked.",
+    "The update made the app faster and far easier to use.",
+    "Honestly a waste of time and money.",
+    "The soundtrack carries an otherwise forgettable film.",
+    "Delivery was late, but the product itself works perfectly.",
+)
+
+_default_backend = os.environ.get("HIT137_BACKEND", "fp32")
+
+
+def default_backend():
+    """Backend new models start with ($HIT137_BACKEND, else fp32)"""
+    return _default_backend if _default_backend in BACKENDS else "fp32"
+
+
+def set_default_backend(backend):
+    global _default_backend
+    _default_backend = validate_backend(backend)
+
+
+def validate_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    return backend
+
+
+def configure_threads(intra_op=None, inter_op=None):
+    """
+    Set torch's intra-op (per operator) and inter-op (parallel operators)
+    thread pools; returns the values in effect
+    """
+    import torch
+    if intra_op:
+        torch.set_num_threads(intra_op)
+    if inter_op:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            # torch only allows this before its first parallel operation
+            print("⚠️  inter-op threads can only be set before the first inference")
+    return {"intra_op": torch.get_num_threads(), "inter_op": torch.get_num_interop_threads()}
+
+
+def apply_backend(module, backend):
+    """Return the module to run for this backend (int8 returns a new module)"""
+    import torch
+
+    validate_backend(backend)
+    module.eval()
+    if backend == "int8":
+        from torch.ao.quantization import quantize_dynamic
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # torch.ao deprecation notices
+            return quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "compiled":
+        # dynamic shapes: sequence length and batch size vary per call
+        module.forward = torch.compile(module.forward, dynamic=True)
+    return module
+
+
+def parity_images(folder, count=8, seed=0):
+    """Write `count` deterministic synthetic test images; returns their paths"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:256, 0:256]
+    paths = []
+    for i in range(count):
+        colour = rng.integers(0, 256, size=3)
+        pattern = np.sin((x * (i + 1) + y * (count - i)) / 16.0)[..., None]
+        noise = rng.integers(-20, 21, size=(256, 256, 3))
+        pixels = (colour * (0.6 + 0.4 * pattern) + noise).clip(0, 255).astype(np.uint8)
+        path = os.path.join(folder, f"parity_{i}.png")
+        Image.fromarray(pixels).save(path)
+        paths.append(path)
+    return paths
+
+
+def _top1(result):
+    """First prediction of a process_batch result (image results are top-k lists)"""
+    return result[0] if isinstance(result, list) else result
+
+
+def parity_check(model_class, backend, samples=None, max_score_diff=0.05, min_agreement=1.0):
+    """
+    Run fp32 and `backend` over the same fixed samples and compare
+
+    Returns a dict with the top-1 label agreement, the largest score
+    difference on agreeing samples, warm timings of both and whether the
+    backend passed the thresholds.
+    """
+    reference = model_class()
+    candidate = model_class()
+    for model, name in ((reference, "fp32"), (candidate, backend)):
+        model.set_cache(None)
+        model.set_backend(name)
+        model.load_model()
+
+    with tempfile.TemporaryDirectory() as folder:
+        if samples is None:
+            images = reference.task == "image-classification"
+            samples = parity_images(folder) if images else list(PARITY_TEXTS)
+        timings = {}
+        outputs = {}
+        for model, name in ((reference, "fp32"), (candidate, backend)):
+            model.process_batch(samples, batch_size=len(samples))  # warm-up / compile
+            start = time.perf_counter()
+            outputs[name] = [_top1(r) for r in
+                             model.process_batch(samples, batch_size=len(samples))]
+            timings[name] = time.perf_counter() - start
+
+    agree = [(a, b) for a, b in zip(outputs["fp32"], outputs[backend])
+             if a["label"] == b["label"]]
+    agreement = len(agree) / len(samples)
+    worst = max((abs(a["score"] - b["score"]) for a, b in agree), default=0.0)
+    return {
+        "model": reference.model_name,
+        "backend": backend,
+        "samples": len(samples),
+        "label_agreement": agreement,
+        "max_score_diff": worst,
+        "fp32_s": timings["fp32"],
+        "backend_s": timings[backend],
+        "speedup": timings["fp32"] / timings[backend] if timings[backend] else 0.0,
+        "passed": agreement >= min_agreement and worst <= max_score_diff,
+    }
@@ -0,0 +1,82 @@
+"""
+Live Sentiment - re-score text as it is typed
+Demonstrates: Composition (wraps a SentimentModel), memoization
+
+A LiveSentimentSession splits the text into sentences and remembers the
+score of every sentence it has seen, so an edit re-runs the model only
+on the sentences that actually changed. The document score is the
+length-weighted mean of the sentence probabilities. Debouncing and
+dropping overtaken requests are the caller's job (see MainWindow).
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+SENTENCE = re.compile(r"[^.!?\n]+(?:[.!?]+|\n|$)")
+
+
+def split_sentences(text):
+    """Sentences (with their trailing punctuation) in order; blanks dropped"""
+    return [match.group().strip() for match in SENTENCE.finditer(text)
+            if match.group().strip()]
+
+
+class LiveSentimentSession:
+    """Incremental document scoring with a per-sentence score memo"""
+
+    def __init__(self, model, max_sentences=2048):
+        self.model = model
+        self.max_sentences = max_sentences
+        self.__memo = OrderedDict()  # normalized sentence -> {"label", "score"}
+        self.__lock = threading.Lock()
+        self.__last = (None, None)   # (text, result)
+
+    def score(self, text):
+        """
+        Score a whole text; returns {label, score, sentences, rescored, reused}
+        or None for blank text
+        """
+        last_text, last_result = self.__last
+        if text == last_text:
+            return last_result
+        sentences = split_sentences(text)
+        if not sentences:
+            return None
+
+        keys = [self.model.content_key(sentence) for sentence in sentences]
+        with self.__lock:
+            known = {key: self.__memo[key] for key in keys if key in self.__memo}
+            for key in known:
+                self.__memo.move_to_end(key)
+        missing = list(dict.fromkeys(key for key in keys if key not in known))
+        if missing:
+            scores = self.model.process_batch(missing, batch_size=len(missing))
+            with self.__lock:
+                for key, result in zip(missing, scores):
+                    known[key] = self.__memo[key] = result
+                while len(self.__memo) > self.max_sentences:
+                    self.__memo.popitem(last=False)
+
+        results = [dict(known[key], text=sentence) for key, sentence in zip(keys, sentences)]
+        result = self._aggregate(results)
+        result["rescored"] = len(missing)
+        result["reused"] = len(sentences) - len(missing)
+        self.__last = (text, result)
+        return result
+
+    @staticmethod
+    def _aggregate(sentences):
+        """Length-weighted mean of P(POSITIVE) over the sentences"""
+        total = sum(len(s["text"]) for s in sentences)
+        positive = sum(len(s["text"]) * (s["score"] if s["label"] == "POSITIVE"
+                                         else 1.0 - s["score"])
+                       for s in sentences) / total
+        label = "POSITIVE" if positive >= 0.5 else "NEGATIVE"
+        return {"label": label, "score": positive if label == "POSITIVE" else 1.0 - positive,
+                "sentences": sentences}
+
+    def clear(self):
+        with self.__lock:
+            self.__memo.clear()
+        self.__last = (None, None)
@@ -5,17 +5,103 @@ HIT137 Assignment 3 - AI GUI Application
 Team: s395508, s395252, s395343, s395499
 """
 
+from utils.startup import StartupTimer
+
+STARTUP = StartupTimer()  # created first so the report covers our own imports
+
+import argparse
+import os
+import threading
+
 from gui.main_window import MainWindow
+from models.inference_backends import BACKENDS
+
+PREWARM_CHOICES = ("sentiment", "image")
+
+def parse_args(argv=None):
+    """Command line options for the GUI"""
+    parser = argparse.ArgumentParser(description="HIT137 AI GUI Application")
+    parser.add_argument("--cache-dir", default=None,
+                        help="enable the on-disk result cache in this directory")
+    parser.add_argument("--cache-mb", type=int, default=None,
+                        help="memory budget of the result cache in MB (default 64)")
+    parser.add_argument("--model-budget-mb", type=int, default=None,
+                        help="unload least recently used models beyond this "
+                             "much weight memory (default: $HIT137_MODEL_BUDGET_MB)")
+    parser.add_argument("--request-budget-mb", type=int, default=None,
+                        help="working memory one request may use; bigger batches "
+                             "are split, oversized inputs refused "
+                             "(default: $HIT137_REQUEST_BUDGET_MB)")
+    parser.add_argument("--prewarm", nargs="*", choices=PREWARM_CHOICES,
+                        default=None,
+                        help="load these models in the background after the "
+                             "window appears (default: $HIT137_PREWARM, "
+                             "comma separated)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="collect latency histograms from the start "
+                             "(Models > Performance Metrics; or HIT137_METRICS=1)")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help="inference backend: fp32, int8 (dynamic quantization) "
+                             "or compiled (default: $HIT137_BACKEND or fp32)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="torch intra-op threads")
+    parser.add_argument("--inter-op-threads", type=int, default=None,
+                        help="torch inter-op threads")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print startup phase timings and an import-time "
+                             "breakdown of the GUI modules")
+    return parser.parse_args(argv)
+
+def prewarm_models(args):
+    """Models to prewarm: the --prewarm flag wins over $HIT137_PREWARM"""
+    if args.prewarm is not None:
+        return tuple(args.prewarm or PREWARM_CHOICES)
+    names = os.environ.get("HIT137_PREWARM", "")
+    return tuple(n.strip() for n in names.split(",") if n.strip() in PREWARM_CHOICES)
 
 def main():
     """Main function to launch the application"""
+    args = parse_args()
+    STARTUP.mark("imports and arguments")
     print("="*50)
     print("HIT137 Assignment 3 - AI GUI Application")
     print("Starting application...")
     print("="*50)
-    
-    app = MainWindow()
+
+    if args.metrics:
+        from utils.instrumentation import metrics
+        metrics.enable()
+
+    if args.cache_dir or args.cache_mb:
+        from models.result_cache import configure_default_cache
+        configure_default_cache(
+            max_bytes=args.cache_mb * 1024 * 1024 if args.cache_mb else None,
+            disk_dir=args.cache_dir)
+
+    if args.backend:
+        from models.inference_backends import set_default_backend
+        set_default_backend(args.backend)
+
+    if args.threads or args.inter_op_threads:
+        from models.inference_backends import configure_threads
+        configure_threads(args.threads, args.inter_op_threads)
+
+    if args.model_budget_mb:
+        from models.model_registry import default_registry
+        default_registry().memory_budget_bytes = args.model_budget_mb * 1024 * 1024
+
+    if args.request_budget_mb:
+        from utils.memory import set_request_budget
+        set_request_budget(args.request_budget_mb * 1024 * 1024)
+
+    timer = STARTUP if args.startup_report else None
+    app = MainWindow(prewarm=prewarm_models(args), startup_timer=timer)
+    STARTUP.mark("window created")
+    if args.startup_report:
+        from utils.startup import format_import_breakdown
+        threading.Thread(target=lambda: print(format_import_breakdown("gui.main_window")),
+                         daemon=True).start()
     app.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
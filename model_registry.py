@@ -0,0 +1,143 @@
+"""
+Model Registry - process-wide sharing of loaded models
+Demonstrates: Encapsulation, Composition, reference counting
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+class _Entry:
+    """One shared model plus its bookkeeping"""
+    __slots__ = ("model", "refs", "lock")
+
+    def __init__(self, model):
+        self.model = model
+        self.refs = 0
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    Hands out one shared BaseModel instance per (HF model id, task, backend)
+
+    - acquire()/release() keep a reference count per model
+    - With a memory budget, loading a model first unloads the least
+      recently used idle pipelines until the newcomer fits. Models still
+      referenced are never unloaded (another thread may be running them);
+      if the budget cannot be met the load goes ahead with a warning.
+      An unloaded model reloads itself the next time it is used.
+    """
+
+    def __init__(self, memory_budget_bytes=None):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.__entries = OrderedDict()  # (hf_model, task, backend) -> _Entry
+        self.__lock = threading.RLock()
+        self.__stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    @staticmethod
+    def key_for(model):
+        return (model.hf_model, model.task, model.get_backend())
+
+    def acquire(self, model_class, load=True, backend=None):
+        """
+        Return the shared instance of model_class, loading it if asked
+        backend defaults to the process-wide default backend
+        """
+        candidate = model_class()
+        if backend is not None:
+            candidate.set_backend(backend)
+        key = self.key_for(candidate)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                entry = _Entry(candidate)
+                candidate.set_registry(self)
+                self.__entries[key] = entry
+            else:
+                self.__stats["hits"] += 1
+            entry.refs += 1
+            self.__entries.move_to_end(key)
+        if load:
+            with entry.lock:  # concurrent acquires wait for a single load
+                if not entry.model.is_loaded():
+                    entry.model.load_model()
+        return entry.model
+
+    def release(self, model):
+        """Drop one reference; idle models stay cached until evicted"""
+        with self.__lock:
+            entry = self.__entries.get(self.key_for(model))
+            if entry is not None and entry.refs > 0:
+                entry.refs -= 1
+
+    def make_room(self, model):
+        """
+        Called from BaseModel.load_model() before the weights are read:
+        evict other pipelines until this model's estimate fits the budget
+        """
+        with self.__lock:
+            key = self.key_for(model)
+            self.__stats["loads"] += 1
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+            if self.memory_budget_bytes is None:
+                return
+            needed = model.memory_bytes()
+            others = [(k, e) for k, e in self.__entries.items()
+                      if k != key and e.model.is_loaded()]
+            used = sum(e.model.memory_bytes() for _, e in others)
+            in_use = 0
+            for _, entry in others:  # least recently used first
+                if used + needed <= self.memory_budget_bytes:
+                    break
+                if entry.refs > 0:
+                    in_use += 1
+                    continue  # in use: unloading would pull the pipeline from under it
+                used -= entry.model.memory_bytes()
+                entry.model.unload_model()
+                self.__stats["evictions"] += 1
+            if used + needed > self.memory_budget_bytes:
+                note = f" ({in_use} models in use cannot be unloaded)" if in_use else ""
+                print(f"⚠️  {model.model_name} exceeds the model memory budget{note}")
+
+    def unload_idle(self):
+        """Unload every model nobody holds a reference to"""
+        with self.__lock:
+            for entry in self.__entries.values():
+                if entry.refs == 0 and entry.model.is_loaded():
+                    entry.model.unload_model()
+                    self.__stats["evictions"] += 1
+
+    def stats(self):
+        """Hit/load/evict counters plus the state of every shared model"""
+        with self.__lock:
+            models = []
+            used = 0
+            for (hf_model, task, backend), entry in self.__entries.items():
+                loaded = entry.model.is_loaded()
+                size = entry.model.memory_bytes() if loaded else 0
+                used += size
+                models.append({"huggingface_model": hf_model, "task": task,
+                               "backend": backend,
+                               "refs": entry.refs, "loaded": loaded,
+                               "memory_bytes": size})
+            stats = dict(self.__stats)
+            stats["memory_budget_bytes"] = self.memory_budget_bytes
+            stats["memory_used_bytes"] = used
+            stats["models"] = models
+        return stats
+
+
+def _budget_from_env():
+    megabytes = os.environ.get("HIT137_MODEL_BUDGET_MB")
+    return int(megabytes) * 1024 * 1024 if megabytes else None
+
+
+_default_registry = ModelRegistry(_budget_from_env())
+
+
+def default_registry():
+    """The registry shared by the GUI and the other entry points"""
+    return _default_registry
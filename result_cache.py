@@ -0,0 +1,174 @@
+"""
+Result Cache - content-addressed, size-bounded cache for model outputs
+Demonstrates: Encapsulation, Composition (every BaseModel owns a cache)
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Two-tier cache keyed by content hashes
+
+    - Memory tier: LRU bounded by the pickled size of the stored values
+    - Disk tier (optional): one pickle file per key, survives restarts
+
+    A memory hit returns the stored object itself, so it costs only a
+    dict lookup. Keys are hex digests built by BaseModel.cache_key().
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_dir=None,
+                 max_disk_bytes=1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.__entries = OrderedDict()  # key -> (value, size)
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+        self.__disk_dir = None
+        self.__disk_bytes = 0
+        self.__stats = {"hits": 0, "misses": 0, "disk_hits": 0,
+                        "evictions": 0, "disk_writes": 0}
+        if disk_dir:
+            self.set_disk_dir(disk_dir)
+
+    def set_disk_dir(self, disk_dir):
+        """Enable (or disable with None) the on-disk tier"""
+        with self.__lock:
+            self.__disk_dir = disk_dir
+            self.__disk_bytes = 0
+            if disk_dir:
+                os.makedirs(disk_dir, exist_ok=True)
+                self.__disk_bytes = sum(size for _, size, _ in self.__disk_files())
+
+    def get(self, key):
+        """Return (hit, value)"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                self.__stats["hits"] += 1
+                return True, entry[0]
+
+        data = self.__read_disk(key)
+        with self.__lock:
+            if data is None:
+                self.__stats["misses"] += 1
+                return False, None
+            self.__stats["hits"] += 1
+            self.__stats["disk_hits"] += 1
+        value = pickle.loads(data)
+        self.__remember(key, value, len(data))
+        return True, value
+
+    def put(self, key, value):
+        """Store a value in memory and, if enabled, on disk"""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.__remember(key, value, len(data))
+        self.__write_disk(key, data)
+
+    def clear(self):
+        """Drop the memory tier (the disk tier is kept)"""
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and current sizes"""
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats["entries"] = len(self.__entries)
+            stats["bytes"] = self.__bytes
+            stats["max_bytes"] = self.max_bytes
+            stats["disk_dir"] = self.__disk_dir
+            stats["disk_bytes"] = self.__disk_bytes
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def __remember(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        with self.__lock:
+            old = self.__entries.pop(key, None)
+            if old is not None:
+                self.__bytes -= old[1]
+            self.__entries[key] = (value, size)
+            self.__bytes += size
+            while self.__bytes > self.max_bytes:
+                _, (_, evicted) = self.__entries.popitem(last=False)
+                self.__bytes -= evicted
+                self.__stats["evictions"] += 1
+
+    def __path(self, key):
+        return os.path.join(self.__disk_dir, key[:2], key + ".pkl")
+
+    def __read_disk(self, key):
+        if not self.__disk_dir:
+            return None
+        try:
+            with open(self.__path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def __write_disk(self, key, data):
+        if not self.__disk_dir or len(data) > self.max_disk_bytes:
+            return
+        path = self.__path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # atomic, so readers never see half a file
+        with self.__lock:
+            self.__disk_bytes += len(data)
+            self.__stats["disk_writes"] += 1
+            over_budget = self.__disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self.__prune_disk()
+
+    def __disk_files(self):
+        for sub in os.scandir(self.__disk_dir):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(".pkl"):
+                    st = entry.stat()
+                    yield entry.path, st.st_size, st.st_mtime
+
+    def __prune_disk(self):
+        """Delete the oldest files until the disk tier is at 90% of budget"""
+        with self.__lock:
+            files = sorted(self.__disk_files(), key=lambda f: f[2])
+            target = self.max_disk_bytes * 0.9
+            for path, size, _ in files:
+                if self.__disk_bytes <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self.__disk_bytes -= size
+
+
+_default_cache = ResultCache()
+
+
+def default_cache():
+    """The process-wide cache shared by all models"""
+    return _default_cache
+
+
+def configure_default_cache(max_bytes=None, disk_dir=None):
+    """Resize the shared cache and/or enable its disk tier"""
+    if max_bytes is not None:
+        _default_cache.max_bytes = max_bytes
+    if disk_dir is not None:
+        _default_cache.set_disk_dir(disk_dir)
+    return _default_cache
@@ -0,0 +1,193 @@
+"""
+Result Records - typed, compact outputs of BaseModel.process()
+Demonstrates: Encapsulation (data) separated from presentation (render)
+
+process() returns one of these instead of a formatted report. Batch
+consumers read the fields (or to_dict() for JSON); only the GUI calls
+render(), which builds the text layout on demand. A failed call returns
+a record whose `error` is set instead of raising.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+@dataclass(slots=True)
+class SentimentResult:
+    label: str = None
+    score: float = 0.0
+    text: str = ""
+    segments: tuple = ()  # long documents: per-window dicts with char spans
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def to_dict(self):
+        if self.error is not None:
+            return {"error": self.error}
+        result = {"label": self.label, "score": self.score}
+        if len(self.segments) > 1:
+            result["segments"] = list(self.segments)
+        return result
+
+    def render(self):
+        """The text report shown in the GUI"""
+        if self.error is not None:
+            return self.error
+        output = f"""
+╔══════════════════════════════════════╗
+║     SENTIMENT ANALYSIS RESULT        ║
+╚══════════════════════════════════════╝
+
+Input: {self.text}
+
+Sentiment: {self.label}
+Confidence: {self.score * 100:.2f}%
+
+{'😊 Positive!' if self.label == 'POSITIVE' else '😔 Negative!'}
+"""
+        if len(self.segments) > 1:
+            output += f"\nLong document: {len(self.segments)} overlapping windows\n"
+            for i, segment in enumerate(self.segments, 1):
+                output += (f"  {i:>3}. chars {segment['start']}-{segment['end']}: "
+                           f"{segment['label']} ({segment['score'] * 100:.1f}%)\n")
+        return output
+
+
+@dataclass(slots=True)
+class ImageResult:
+    labels: tuple = ()  # top-k, best first
+    scores: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float32))
+    path: str = None
+    timings: dict = field(default_factory=dict)
+    error: str = None
+
+    @classmethod
+    def from_predictions(cls, predictions, path=None, timings=None):
+        """From a [{"label", "score"}, ...] top-k list"""
+        return cls(labels=tuple(p["label"] for p in predictions),
+                   scores=np.fromiter((p["score"] for p in predictions), dtype=np.float32,
+                                      count=len(predictions)),
+                   path=path, timings=dict(timings or {}))
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def label(self):
+        return self.labels[0] if self.labels else None
+
+    @property
+    def score(self):
+        return float(self.scores[0]) if len(self.scores) else 0.0
+
+    def predictions(self):
+        return [{"label": label, "score": float(score)}
+                for label, score in zip(self.labels, self.scores)]
+
+    def to_dict(self):
+        result = {"path": self.path} if self.path is not None else {}
+        if self.error is not None:
+            result["error"] = self.error
+        else:
+            result["predictions"] = self.predictions()
+            result["timings"] = dict(self.timings)
+        return result
+
+    def render(self, top=5):
+        """The text report shown in the GUI"""
+        if self.error is not None:
+            return self.error
+        output = f"""
+╔══════════════════════════════════════╗
+║   IMAGE CLASSIFICATION RESULTS       ║
+╚══════════════════════════════════════╝
+
+Top {top} Predictions:
+
+"""
+        for i, (label, score) in enumerate(zip(self.labels[:top], self.scores[:top] * 100), 1):
+            bar = "█" * int(score / 5)
+            output += f"{i}. {label:.<30} {score:>6.2f}%\n   {bar}\n\n"
+        if self.timings:
+            output += (f"Decode: {self.timings.get('decode_ms', 0.0):.1f} ms | "
+                       f"Resize: {self.timings.get('resize_ms', 0.0):.1f} ms | "
+                       f"Forward: {self.timings.get('forward_ms', 0.0):.1f} ms\n")
+        return output
+
+
+@dataclass(slots=True)
+class FrameSequenceResult:
+    source: str = None
+    total_frames: int = 0
+    stride: int = 1
+    duplicates: int = 0  # sampled frames skipped as near-duplicates
+    frames: tuple = ()   # ImageResult per classified frame
+    indices: tuple = ()  # frame number of each classified frame
+    weights: tuple = ()  # sampled frames each classified frame stands for
+    overall: ImageResult = None  # weighted mean over the frames
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def label(self):
+        return self.overall.label if self.overall is not None else None
+
+    @property
+    def score(self):
+        return self.overall.score if self.overall is not None else 0.0
+
+    def to_dict(self):
+        result = {"source": self.source}
+        if self.error is not None:
+            result["error"] = self.error
+            return result
+        result.update(total_frames=self.total_frames, stride=self.stride,
+                      classified=len(self.frames), duplicates=self.duplicates,
+                      predictions=self.overall.predictions(),
+                      timings=dict(self.overall.timings),
+                      frames=[{"index": index, "weight": weight,
+                               "predictions": frame.predictions()}
+                              for index, weight, frame
+                              in zip(self.indices, self.weights, self.frames)])
+        return result
+
+    def render(self, top=5):
+        """The text report shown in the GUI: overall top-k, then one line per frame"""
+        if self.error is not None:
+            return self.error
+        output = f"""
+╔══════════════════════════════════════╗
+║   FRAME SEQUENCE RESULTS             ║
+╚══════════════════════════════════════╝
+
+Frames: {self.total_frames} | every {self.stride} sampled | {len(self.frames)} classified | {self.duplicates} near-duplicates skipped
+
+Top {top} Overall:
+
+"""
+        overall = self.overall
+        for i, (label, score) in enumerate(zip(overall.labels[:top], overall.scores[:top] * 100), 1):
+            bar = "█" * int(score / 5)
+            output += f"{i}. {label:.<30} {score:>6.2f}%\n   {bar}\n\n"
+        output += "Per frame:\n"
+        for index, weight, frame in zip(self.indices, self.weights, self.frames):
+            repeat = f" x{weight}" if weight > 1 else ""
+            output += f"  #{index:<5}{repeat:<5} {frame.label:.<30} {frame.score * 100:>6.2f}%\n"
+        if overall.timings:
+            output += (f"\nDecode: {overall.timings.get('decode_ms', 0.0):.1f} ms | "
+                       f"Resize: {overall.timings.get('resize_ms', 0.0):.1f} ms | "
+                       f"Forward: {overall.timings.get('forward_ms', 0.0):.1f} ms\n")
+        return output
+
+
+def render(result):
+    """Text for the GUI: records are rendered, plain strings pass through"""
+    return result if isinstance(result, str) else result.render()
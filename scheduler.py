@@ -0,0 +1,239 @@
+"""
+Model Scheduler - prioritized, deadline-aware job queue in front of a model
+Demonstrates: Encapsulation (heap + worker thread hidden behind submit)
+
+    future = model.process_async("Great film!")             # INTERACTIVE
+    future = model.submit(model.process_batch, texts)        # BATCH
+    future.result(timeout=5); future.cancel()
+
+One worker thread per model runs jobs in (priority, deadline, arrival)
+order, so an interactive request waits for at most the job that is
+already running - never for the bulk backlog. Bulk work should be
+submitted as many small jobs (see map()), or as one streaming job that
+calls run_higher() between items, to keep that wait short.
+
+- Deadlines: a job whose deadline passed while it was queued fails with
+  DeadlineExceeded instead of running
+- Cancellation: Future.cancel() works until the job starts; a job whose
+  callers all cancelled is skipped
+- Coalescing: submissions with the same key while one is queued or
+  running share its computation (and the best priority/deadline)
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from utils.instrumentation import LatencyHistogram
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+
+class DeadlineExceeded(TimeoutError):
+    """The job's deadline passed before the model got to it"""
+
+
+class _Job:
+    __slots__ = ("func", "args", "kwargs", "key", "priority", "deadline",
+                 "waiters", "running", "version")
+
+    def __init__(self, func, args, kwargs, key, priority):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.priority = priority
+        self.deadline = None
+        self.waiters = []  # (future, priority, deadline, submitted_ns)
+        self.running = False
+        self.version = 0   # heap entries of older versions are stale
+
+
+class ModelScheduler:
+    """Priority queue plus one worker thread serving one model"""
+
+    def __init__(self, name="model"):
+        self.name = name
+        self.__heap = []  # (priority, deadline, seq, version, job)
+        self.__seq = itertools.count()
+        self.__cond = threading.Condition()
+        self.__inflight = {}  # coalescing key -> queued or running _Job
+        self.__thread = None
+        self.__closed = False
+        self.__stats = {"submitted": 0, "coalesced": 0, "completed": 0,
+                        "cancelled": 0, "expired": 0, "failed": 0}
+        self.__latency = {priority: LatencyHistogram() for priority in PRIORITY_NAMES}
+
+    def submit(self, func, *args, priority=BATCH, deadline=None, key=None, **kwargs):
+        """
+        Queue func(*args, **kwargs); returns a concurrent.futures.Future
+        deadline is a time.monotonic() timestamp; key enables coalescing
+        """
+        future = Future()
+        with self.__cond:
+            if self.__closed:
+                raise RuntimeError(f"{self.name} scheduler is shut down")
+            self.__stats["submitted"] += 1
+            job = self.__inflight.get(key) if key is not None else None
+            if job is None:
+                job = _Job(func, args, kwargs, key, priority)
+                if key is not None:
+                    self.__inflight[key] = job
+            else:
+                self.__stats["coalesced"] += 1
+            job.waiters.append((future, priority, deadline, time.perf_counter_ns()))
+            if not job.running and (len(job.waiters) == 1 or priority < job.priority
+                                    or _earlier(deadline, job.deadline)):
+                job.priority = min(job.priority, priority)
+                job.deadline = deadline if _earlier(deadline, job.deadline) else job.deadline
+                job.version += 1
+                heapq.heappush(self.__heap, (job.priority, _order(job.deadline),
+                                             next(self.__seq), job.version, job))
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__work, daemon=True,
+                                                 name=f"{self.name}-scheduler")
+                self.__thread.start()
+            self.__cond.notify()
+        return future
+
+    def map(self, func, chunks, priority=BATCH, window=2):
+        """
+        Generator over func(chunk) for each chunk, in order, with at most
+        `window` chunks queued at once so higher-priority jobs can slip in
+        between them; closing it cancels the chunks still queued
+        """
+        pending = deque()
+        chunks = iter(chunks)
+        try:
+            for chunk in itertools.islice(chunks, window):
+                pending.append(self.submit(func, chunk, priority=priority))
+            while pending:
+                result = pending.popleft().result()
+                following = next(chunks, None)
+                if following is not None:
+                    pending.append(self.submit(func, following, priority=priority))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self, wait=True):
+        """Finish the running job, cancel everything still queued"""
+        with self.__cond:
+            self.__closed = True
+            queued = [job for *_, job in self.__heap]
+            self.__heap.clear()
+            self.__cond.notify_all()
+        for job in queued:
+            for future, *_ in job.waiters:
+                future.cancel()
+        if wait and self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+
+    def run_higher(self, priority):
+        """
+        Called from inside a running job: run the queued jobs that rank
+        above `priority` right now, on this worker thread, then return how
+        many ran. Lets one long streaming job give way between its items
+        """
+        if threading.current_thread() is not self.__thread:
+            return 0
+        ran = 0
+        while self.__run_one(below=priority):
+            ran += 1
+        return ran
+
+    def __work(self):
+        while True:
+            with self.__cond:
+                while not self.__heap and not self.__closed:
+                    self.__cond.wait()
+                if not self.__heap:
+                    return
+            self.__run_one()
+
+    def __run_one(self, below=None):
+        """Run the best queued job (if its priority < below); False if there was none"""
+        with self.__cond:
+            while True:
+                if not self.__heap:
+                    return False
+                priority, _, _, version, job = self.__heap[0]
+                if below is not None and priority >= below:
+                    return False
+                heapq.heappop(self.__heap)
+                if version != job.version or job.running:
+                    continue  # re-prioritized copy, or already ran
+                job.running = True
+                if self.__start_waiters(job):
+                    break
+                self.__forget(job)
+        try:
+            result, error = job.func(*job.args, **job.kwargs), None
+        except BaseException as e:
+            result, error = None, e
+        with self.__cond:
+            self.__forget(job)
+            self.__stats["completed" if error is None else "failed"] += 1
+            waiters = list(job.waiters)
+        self.__deliver(waiters, result, error)
+        return True
+
+    def __start_waiters(self, job):
+        """Drop cancelled and expired callers; returns how many still wait"""
+        now = time.monotonic()
+        live = 0
+        for future, _, deadline, _ in job.waiters:
+            if not future.set_running_or_notify_cancel():
+                self.__stats["cancelled"] += 1
+            elif deadline is not None and now > deadline:
+                future.set_exception(DeadlineExceeded(
+                    f"{self.name}: deadline passed {(now - deadline) * 1000:.0f} ms "
+                    f"before the job could start"))
+                self.__stats["expired"] += 1
+            else:
+                live += 1
+        return live
+
+    def __forget(self, job):
+        if job.key is not None and self.__inflight.get(job.key) is job:
+            del self.__inflight[job.key]
+
+    def __deliver(self, waiters, result, error):
+        for future, priority, _, submitted in waiters:
+            if future.done() or (not future.running()
+                                 and not future.set_running_or_notify_cancel()):
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+            with self.__cond:
+                self.__latency[priority].record(time.perf_counter_ns() - submitted)
+
+    def stats(self):
+        """Counters, queue depth per priority and end-to-end latency"""
+        with self.__cond:
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for _, _, _, version, job in self.__heap:
+                if version == job.version and not job.running:
+                    queued[PRIORITY_NAMES[job.priority]] += 1
+            stats = dict(self.__stats)
+            stats["queued"] = queued
+            stats["latency"] = {PRIORITY_NAMES[p]: h.summary()
+                                for p, h in self.__latency.items() if h.count}
+        return stats
+
+
+def _earlier(deadline, other):
+    return deadline is not None and (other is None or deadline < other)
+
+
+def _order(deadline):
+    return float("inf") if deadline is None else deadline
+
@@ -3,10 +3,14 @@ Sentiment Analysis Model (Model 1)
 Demonstrates: Inheritance, Method Overriding, Multiple Decorators
 """
 
+import unicodedata
+
 from models.base_model import BaseModel
+from models.results import SentimentResult
 from utils.decorators import (timing_decorator, error_handler_decorator, 
-                              logging_decorator, validation_decorator)
-from transformers import pipeline
+                              logging_decorator, validation_decorator,
+                              cache_decorator, memory_decorator, logger)
+from utils.instrumentation import span
 
 class SentimentModel(BaseModel):
     """
@@ -14,6 +18,8 @@ class SentimentModel(BaseModel):
     DEMONSTRATES: INHERITANCE, METHOD OVERRIDING, POLYMORPHISM
     """
     
+    result_class = SentimentResult
+    
     def __init__(self):
         """Initialize - calls parent constructor"""
         super().__init__(
@@ -22,7 +28,10 @@ class SentimentModel(BaseModel):
             description="Analyzes if text is positive or negative"
         )
         self.hf_model = "distilbert-base-uncased-finetuned-sst-2-english"
+        self.task = "sentiment-analysis"
+        self.estimated_bytes = 268 * 1024 * 1024  # fp32 weights, before loading
     
+    @memory_decorator
     def load_model(self):
         """
         Override parent's load_model
@@ -30,7 +39,9 @@ class SentimentModel(BaseModel):
         """
         super().load_model()  # Call parent method
         print(f"Loading sentiment pipeline...")
-        self._pipeline = pipeline("sentiment-analysis", model=self.hf_model)
+        with span(self.model_name, "load"):
+            self._pipeline = self._build_pipeline()
+            self._apply_backend()
         self.set_loaded(True)
         print("✅ Sentiment model ready!")
     
@@ -38,32 +49,151 @@ class SentimentModel(BaseModel):
     @error_handler_decorator
     @logging_decorator
     @validation_decorator
+    @cache_decorator
+    @memory_decorator
     def process(self, input_data):
         """
         Process text - DEMONSTRATES: POLYMORPHISM + MULTIPLE DECORATORS
+        Returns a SentimentResult; call render() for the GUI text
         """
         if not self.is_loaded():
             self.load_model()
         
-        print(f"Analyzing: '{input_data[:50]}...'")
-        result = self._pipeline(input_data)[0]
+        logger.debug("Analyzing: '%s...'", input_data[:50])
+        result = self.process_long(input_data)
+        return SentimentResult(label=result["label"], score=result["score"],
+                               text=input_data, segments=tuple(result["segments"]))
+    
+    def process_long(self, text, stride=128, batch_size=16):
+        """
+        Sliding-window sentiment for texts longer than the model limit
         
-        label = result['label']
-        score = result['score'] * 100
+        The text is tokenized once into windows of up to 512 tokens that
+        overlap by `stride` tokens. All windows are scored in batched
+        forward passes; the document score is the token-count-weighted mean
+        of the window probabilities. Returns a dict with label, score and
+        a per-window "segments" breakdown (character spans + scores).
+        """
+        if not self.is_loaded():
+            self.load_model()
+        import torch
         
-        output = f"""
-╔══════════════════════════════════════╗
-║     SENTIMENT ANALYSIS RESULT        ║
-╚══════════════════════════════════════╝
-
-Input: {input_data}
-
-Sentiment: {label}
-Confidence: {score:.2f}%
-
-{'😊 Positive!' if label == 'POSITIVE' else '😔 Negative!'}
-"""
-        return output
+        tokenizer = self._pipeline.tokenizer
+        model = self._pipeline.model
+        max_length = min(tokenizer.model_max_length, model.config.max_position_embeddings)
+        stride = min(stride, max_length // 2)
+        
+        # one tokenizer call: the fast tokenizer emits the overlapping
+        # windows (with special tokens and character offsets) itself
+        with span(self.model_name, "tokenize"):
+            encoding = tokenizer(text, truncation=True, max_length=max_length,
+                                 stride=stride, return_overflowing_tokens=True,
+                                 return_offsets_mapping=True, padding="longest",
+                                 return_tensors="pt")
+        input_ids = encoding["input_ids"]
+        attention_mask = encoding["attention_mask"]
+        batch_size = self.fit_batch_size(batch_size, self._activation_bytes(input_ids.shape[1]))
+        
+        probabilities = []
+        for first in range(0, len(input_ids), batch_size):
+            with span(self.model_name, "forward"), torch.inference_mode():
+                logits = model(input_ids=input_ids[first:first + batch_size],
+                               attention_mask=attention_mask[first:first + batch_size]).logits
+            probabilities.extend(logits.softmax(-1).tolist())
+        
+        id2label = model.config.id2label
+        segments = []
+        for offsets, p in zip(encoding["offset_mapping"].tolist(), probabilities):
+            spans = [(a, b) for a, b in offsets if b > a]  # skips specials and padding
+            best = max(range(len(p)), key=p.__getitem__)
+            segments.append({"label": id2label[best], "score": p[best],
+                             "tokens": max(len(spans), 1),
+                             "start": spans[0][0] if spans else 0,
+                             "end": spans[-1][1] if spans else 0})
+        
+        weights = [segment["tokens"] for segment in segments]
+        document = [sum(w * p[k] for w, p in zip(weights, probabilities)) / sum(weights)
+                    for k in range(len(id2label))]
+        best = max(range(len(document)), key=document.__getitem__)
+        return {"label": id2label[best], "score": document[best], "segments": segments}
+    
+    @timing_decorator
+    @logging_decorator
+    @memory_decorator
+    def process_batch(self, inputs, batch_size=32):
+        """
+        Score many texts with length-bucketed dynamic padding
+        Inputs are sorted by length so each batch only pads to its own
+        longest member; results come back in the original order
+        """
+        return self._cached_batch(
+            inputs, lambda texts: self._score_batch(texts, batch_size))
+    
+    def _score_batch(self, texts, batch_size):
+        """
+        Run the pipeline over length-sorted buckets of texts
+        Texts over the model limit are scored with process_long's
+        sliding windows, as process() does, instead of being truncated
+        """
+        if not self.is_loaded():
+            self.load_model()
+        
+        results = [None] * len(texts)
+        tokenizer = self._pipeline.tokenizer
+        max_length = min(tokenizer.model_max_length,
+                         self._pipeline.model.config.max_position_embeddings)
+        # a token covers at least one character: only longer texts can overflow
+        maybe_long = [i for i, text in enumerate(texts) if len(text) + 2 > max_length]
+        if maybe_long:
+            counts = tokenizer([texts[i] for i in maybe_long], verbose=False)["input_ids"]
+            for i, ids in zip(maybe_long, counts):
+                if len(ids) > max_length:
+                    result = self.process_long(texts[i], batch_size=batch_size)
+                    results[i] = {"label": result["label"], "score": result["score"]}
+        order = sorted((i for i in range(len(texts)) if results[i] is None),
+                       key=lambda i: len(texts[i]))
+        start = 0
+        while start < len(order):
+            # a token covers at least one character: size by the longest text
+            longest = len(texts[order[min(start + batch_size, len(order)) - 1]])
+            size = self.fit_batch_size(batch_size, self._activation_bytes(
+                min(longest + 2, max_length)))
+            bucket = order[start:start + size]
+            start += size
+            with span(self.model_name, "batch_pipeline"):
+                outputs = self._pipeline([texts[i] for i in bucket],
+                                         batch_size=len(bucket), truncation=True)
+            for i, result in zip(bucket, outputs):
+                results[i] = {"label": result['label'], "score": result['score']}
+        return results
+    
+    def process_file(self, input_path, output_path, column="text", batch_size=32,
+                     resume=True, progress=None, **options):
+        """
+        Stream a CSV or text file through process_batch into a JSONL/CSV
+        file, resuming from the output's checkpoint (see file_streaming)
+        """
+        from models.file_streaming import stream_file
+        if not self.is_loaded():
+            self.load_model()
+        return stream_file(lambda texts: self.process_batch(texts, batch_size=batch_size),
+                           input_path, output_path, column=column, batch_size=batch_size,
+                           resume=resume, progress=progress, **options)
+    
+    def _activation_bytes(self, length):
+        """
+        Rough fp32 working memory of one sequence of `length` tokens in a
+        forward pass: the attention scores/probabilities of one layer plus
+        a handful of hidden-size activations (Q, K, V, FFN, residuals)
+        """
+        config = self._pipeline.model.config
+        return 4 * length * (2 * config.num_attention_heads * length + 10 * config.hidden_size)
+    
+    def content_key(self, input_data):
+        """Cache key content: Unicode- and whitespace-normalized text"""
+        if not isinstance(input_data, str):
+            return None
+        return " ".join(unicodedata.normalize("NFC", input_data).split())
     
     def get_info(self):
         """Override to add specific info - METHOD OVERRIDING"""
@@ -0,0 +1,253 @@
+"""
+Local Inference Server - one shared copy of each model for many clients
+HIT137 Assignment 3 - AI GUI Application
+
+    python cli.py serve --port 8137 --max-batch-size 32 --max-wait-ms 5
+
+Endpoints (JSON over HTTP/1.1, keep-alive supported):
+    POST /v1/sentiment   {"text": "..."} or {"texts": ["...", ...]}
+    POST /v1/image       {"path": "..."} or {"paths": ["...", ...]}
+    GET  /metrics        queue depth, batch sizes, latency histograms
+    GET  /health
+
+Concurrent requests are collected into micro-batches (flushed at the max
+batch size or after max-wait ms) and every forward pass runs on the
+model's own worker thread, so the asyncio event loop never blocks.
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.instrumentation import LatencyHistogram, metrics
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class MicroBatcher:
+    """
+    Groups concurrent submissions into batches for one model
+
+    While a batch is running on the worker thread, new requests queue up,
+    so the next batch is naturally larger: throughput grows with load
+    instead of staying at one request per forward pass.
+    """
+
+    def __init__(self, name, process_batch, max_batch_size=32, max_wait_ms=5.0):
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._process_batch = process_batch
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._task = None
+        self._batch_sizes = {}
+        self._batches = 0
+        self._items = 0
+        self._in_flight = 0
+        self._latency = LatencyHistogram()
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def submit(self, item):
+        """Queue one input and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        start = time.perf_counter_ns()
+        await self._queue.put((item, future))
+        try:
+            return await future
+        finally:
+            self._latency.record(time.perf_counter_ns() - start)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if batch:
+                await self._dispatch(loop, batch)
+
+    async def _dispatch(self, loop, batch):
+        size = len(batch)
+        self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
+        self._batches += 1
+        self._items += size
+        self._in_flight = size
+        try:
+            results = await loop.run_in_executor(
+                self._executor, self._process_batch, [item for item, _ in batch])
+        except Exception as e:
+            if size == 1:
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+            else:
+                await self._dispatch_each(loop, batch)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._in_flight = 0
+
+    async def _dispatch_each(self, loop, batch):
+        """The batch failed: retry item by item so only the bad request gets the error"""
+        for item, future in batch:
+            if future.done():
+                continue
+            try:
+                results = await loop.run_in_executor(self._executor, self._process_batch, [item])
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(results[0])
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize(),
+            "in_flight": self._in_flight,
+            "batches": self._batches,
+            "items": self._items,
+            "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "request_latency": self._latency.summary(),
+        }
+
+
+class InferenceServer:
+    """Minimal asyncio HTTP/1.1 front end for the micro-batchers"""
+
+    def __init__(self, batchers):
+        self.batchers = batchers  # route name -> (MicroBatcher, single key, list key)
+        self.started = time.time()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, version = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+
+                status, payload = await self.route(method, path, body)
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version == "HTTP/1.1")
+                data = json.dumps(payload).encode("utf-8")
+                writer.write((f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                              f"Content-Type: application/json\r\n"
+                              f"Content-Length: {len(data)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                              f"\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ValueError, ConnectionError):
+            return
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok", "models": sorted(self.batchers)}
+        if path == "/metrics":
+            return 200, {"uptime_s": time.time() - self.started,
+                         "batchers": {name: entry[0].stats()
+                                      for name, entry in self.batchers.items()},
+                         "instrumentation": metrics.snapshot()}
+        name = path.rsplit("/", 1)[-1]
+        if not path.startswith("/v1/") or name not in self.batchers:
+            return 404, {"error": f"unknown endpoint {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        batcher, single, many = self.batchers[name]
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError as e:
+            return 400, {"error": f"invalid JSON: {e}"}
+        if not isinstance(request, dict):
+            return 400, {"error": f"expected a JSON object with '{single}' or '{many}'"}
+        try:
+            if many in request:
+                values = request[many]
+                if not isinstance(values, list) or not all(map(_non_empty_string, values)):
+                    return 400, {"error": f"'{many}' must be a list of non-empty strings"}
+                results = await asyncio.gather(*(batcher.submit(x) for x in values))
+                return 200, {"results": results}
+            if single in request:
+                if not _non_empty_string(request[single]):
+                    return 400, {"error": f"'{single}' must be a non-empty string"}
+                return 200, await batcher.submit(request[single])
+        except Exception as e:
+            return 500, {"error": str(e)}
+        return 400, {"error": f"expected '{single}' or '{many}'"}
+
+
+def _non_empty_string(value):
+    return isinstance(value, str) and bool(value.strip())
+
+
+def build_batchers(models, max_batch_size, max_wait_ms, backend=None):
+    """Load each model once through the shared registry"""
+    from models.model_registry import default_registry
+
+    batchers = {}
+    if "sentiment" in models:
+        from models.sentiment_model import SentimentModel
+        sentiment = default_registry().acquire(SentimentModel, backend=backend)
+        batchers["sentiment"] = (MicroBatcher(
+            "sentiment", lambda texts: sentiment.process_batch(texts, batch_size=len(texts)),
+            max_batch_size, max_wait_ms), "text", "texts")
+    if "image" in models:
+        from models.image_model import ImageClassificationModel
+        image = default_registry().acquire(ImageClassificationModel, backend=backend)
+        batchers["image"] = (MicroBatcher(
+            "image", lambda paths: list(image.classify_paths(paths, batch_size=len(paths))),
+            max_batch_size, max_wait_ms), "path", "paths")
+    return batchers
+
+
+async def serve(host="127.0.0.1", port=8137, models=("sentiment", "image"),
+                max_batch_size=32, max_wait_ms=5.0, backend=None):
+    batchers = build_batchers(models, max_batch_size, max_wait_ms, backend)
+    for batcher, _, _ in batchers.values():
+        batcher.start()
+    app = InferenceServer(batchers)
+    server = await asyncio.start_server(app.handle, host, port)
+    print(f"Serving {', '.join(batchers)} on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for batcher, _, _ in batchers.values():
+            await batcher.stop()
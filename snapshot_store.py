@@ -0,0 +1,132 @@
+"""
+Snapshot Store - local, offline copies of the models' weights and processors
+Demonstrates: Encapsulation (callers only see load_pipeline)
+
+    python cli.py snapshot                  # once, while online
+    python cli.py snapshot --list
+
+A snapshot is a directory under ~/.cache/hit137/snapshots (or
+$HIT137_SNAPSHOT_DIR) holding
+    model.safetensors + config.json    weights, memory-mapped when loaded
+    tokenizer.json / preprocessor_config.json   pre-serialized fast tokenizer
+                                                or image processor
+    manifest.json                      written last: the snapshot is complete
+
+Loading from a snapshot reads only local files (local_files_only=True):
+no Hub resolution and no network, so the app works air-gapped. Models
+without a snapshot keep loading through the Hugging Face cache.
+"""
+
+import json
+import os
+import shutil
+import time
+
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+# task -> (model auto class, processor auto class, pipeline keyword)
+TASK_CLASSES = {
+    "sentiment-analysis": ("AutoModelForSequenceClassification", "AutoTokenizer", "tokenizer"),
+    "image-classification": ("AutoModelForImageClassification", "AutoImageProcessor",
+                             "image_processor"),
+}
+
+
+def default_snapshot_root():
+    return os.environ.get("HIT137_SNAPSHOT_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "hit137", "snapshots")
+
+
+def snapshot_dir(model_id, root=None):
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in model_id)
+    return os.path.join(root or default_snapshot_root(), safe)
+
+
+def read_manifest(model_id, root=None):
+    """The snapshot's manifest, or None when there is no complete snapshot"""
+    try:
+        with open(os.path.join(snapshot_dir(model_id, root), MANIFEST_FILE),
+                  encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == SNAPSHOT_VERSION else None
+
+
+def resolve(model_id, root=None):
+    """Local snapshot directory for model_id if there is one, else model_id"""
+    if read_manifest(model_id, root) is not None:
+        return snapshot_dir(model_id, root)
+    return model_id
+
+
+def create_snapshot(model_id, task, root=None):
+    """
+    Download (or read from the Hub cache) model_id and write its snapshot;
+    returns the manifest. The new snapshot is built next to the old one,
+    which is renamed aside only right before the new one is renamed into
+    place and deleted afterwards, so a model is without a snapshot only
+    between two renames
+    """
+    import transformers
+
+    model_class, processor_class, _ = TASK_CLASSES[task]
+    target = snapshot_dir(model_id, root)
+    tmp = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    model = getattr(transformers, model_class).from_pretrained(model_id)
+    model.save_pretrained(tmp, safe_serialization=True)
+    processor = getattr(transformers, processor_class).from_pretrained(model_id)
+    processor.save_pretrained(tmp)
+
+    files = sorted(os.listdir(tmp))
+    manifest = {"version": SNAPSHOT_VERSION, "model": model_id, "task": task,
+                "transformers": transformers.__version__, "created": time.time(),
+                "bytes": sum(os.path.getsize(os.path.join(tmp, f)) for f in files),
+                "files": files}
+    with open(os.path.join(tmp, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    old = None
+    if os.path.exists(target):
+        old = f"{target}.old-{os.getpid()}"
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(target, old)
+    os.replace(tmp, target)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def list_snapshots(root=None):
+    """Manifests of every complete snapshot under root"""
+    root = root or default_snapshot_root()
+    if not os.path.isdir(root):
+        return []
+    manifests = []
+    for name in sorted(os.listdir(root)):
+        if ".old-" in name or ".tmp-" in name:
+            continue  # left over by an interrupted create_snapshot()
+        try:
+            with open(os.path.join(root, name, MANIFEST_FILE), encoding="utf-8") as f:
+                manifests.append(dict(json.load(f), path=os.path.join(root, name)))
+        except (OSError, ValueError):
+            continue  # unfinished or foreign directory
+    return manifests
+
+
+def load_pipeline(task, model_id, root=None):
+    """
+    Build the transformers pipeline for model_id, from its snapshot when
+    one exists (local files only), otherwise through the Hub cache
+    """
+    import transformers
+
+    path = resolve(model_id, root)
+    if path == model_id:
+        return transformers.pipeline(task, model=model_id)
+    model_class, processor_class, keyword = TASK_CLASSES[task]
+    model = getattr(transformers, model_class).from_pretrained(path, local_files_only=True)
+    processor = getattr(transformers, processor_class).from_pretrained(
+        path, local_files_only=True)
+    return transformers.pipeline(task, model=model, **{keyword: processor})
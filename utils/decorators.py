@@ -3,21 +3,34 @@ Custom Decorators - Demonstrates MULTIPLE DECORATORS
 Author: Team HIT137
 """
 
-import time
 import functools
+import logging
+import time
+
+from utils.instrumentation import metrics
+from utils.memory import MemoryProbe
+
+logger = logging.getLogger("hit137")
 
 def timing_decorator(func):
-    """Decorator #1: Measures execution time"""
+    """Decorator #1: Records execution time in the metrics histograms"""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
-        print(f"\n⏱️  Starting {func.__name__}...")
-        result = func(*args, **kwargs)
-        elapsed = time.time() - start
-        print(f"✅ Completed in {elapsed:.2f} seconds")
-        return result
+        if not metrics.enabled:
+            return func(*args, **kwargs)
+        owner = getattr(args[0], "model_name", func.__qualname__) if args else func.__qualname__
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.record_ns(owner, func.__name__, time.perf_counter_ns() - start)
     return wrapper
 
+def _error_result(owner, message):
+    """The owner's error record (result_class), or the bare message"""
+    result_class = getattr(owner, "result_class", None)
+    return message if result_class is None else result_class(error=message)
+
 def error_handler_decorator(func):
     """Decorator #2: Handles errors gracefully"""
     @functools.wraps(func)
@@ -26,17 +39,19 @@ def error_handler_decorator(func):
             return func(*args, **kwargs)
         except Exception as e:
             error_msg = f"❌ Error in {func.__name__}: {str(e)}"
-            print(error_msg)
-            return error_msg
+            logger.error(error_msg)
+            return _error_result(args[0] if args else None, error_msg)
     return wrapper
 
 def logging_decorator(func):
-    """Decorator #3: Logs function execution"""
+    """Decorator #3: Logs function execution (DEBUG level only)"""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        print(f"📝 Executing: {func.__name__}")
+        if not logger.isEnabledFor(logging.DEBUG):
+            return func(*args, **kwargs)
+        logger.debug("Executing: %s", func.__name__)
         result = func(*args, **kwargs)
-        print(f"📝 Finished: {func.__name__}")
+        logger.debug("Finished: %s", func.__name__)
         return result
     return wrapper
 
@@ -47,6 +62,37 @@ def validation_decorator(func):
         if len(args) > 1:
             input_data = args[1]
             if input_data is None or (isinstance(input_data, str) and input_data.strip() == ""):
-                return "⚠️  Error: Input cannot be empty"
+                return _error_result(args[0], "⚠️  Error: Input cannot be empty")
         return func(*args, **kwargs)
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+def cache_decorator(func):
+    """Decorator #5: Serves repeated inputs from the model's result cache"""
+    @functools.wraps(func)
+    def wrapper(self, input_data, *args, **kwargs):
+        cache = self.get_cache()
+        key = None
+        if cache is not None and not args and not kwargs:
+            key = self.cache_key(input_data, func.__name__)
+        if key is None:
+            return func(self, input_data, *args, **kwargs)
+        hit, result = cache.get(key)
+        result_class = getattr(self, "result_class", None)
+        if hit and (result_class is None or isinstance(result, result_class)):
+            return result  # (older disk entries hold formatted strings: recomputed)
+        result = func(self, input_data, *args, **kwargs)
+        cache.put(key, result)
+        return result
+    return wrapper
+
+def memory_decorator(func):
+    """Decorator #6: Records the RSS growth and peak of a model call"""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if func.__name__ != "load_model" and not self.is_loaded():
+            self.load_model()  # a lazy load is accounted to load_model
+        with MemoryProbe() as probe:
+            result = func(self, *args, **kwargs)
+        self.record_memory(func.__name__, probe)
+        return result
+    return wrapper
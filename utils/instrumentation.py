@@ -0,0 +1,170 @@
+"""
+Instrumentation - low-overhead spans and latency histograms
+Author: Team HIT137
+
+    from utils.instrumentation import metrics, span
+
+    with span("DistilBERT Sentiment Analyzer", "forward"):
+        ...
+
+Disabled by default (HIT137_METRICS=1 or metrics.enable() turns it on);
+while disabled span() returns one shared no-op object, so the cost is a
+single attribute check.
+"""
+
+import json
+import os
+import threading
+import time
+
+_SUB_BUCKETS = 4  # per power of two: ~19% worst-case bucket width
+
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond durations with fixed memory"""
+
+    __slots__ = ("counts", "count", "total_ns", "min_ns", "max_ns")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    @staticmethod
+    def _bucket(ns):
+        if ns < _SUB_BUCKETS:
+            return ns
+        exponent = ns.bit_length() - 1
+        sub = (ns >> (exponent - 2)) & (_SUB_BUCKETS - 1)
+        return exponent * _SUB_BUCKETS + sub
+
+    @staticmethod
+    def _upper_bound(bucket):
+        exponent, sub = divmod(bucket, _SUB_BUCKETS)
+        if exponent < 2:
+            return bucket
+        return (_SUB_BUCKETS + sub + 1) << (exponent - 2)
+
+    def record(self, ns):
+        bucket = self._bucket(ns)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, q):
+        """Approximate q-th percentile (0-100) in nanoseconds"""
+        if not self.count:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._upper_bound(bucket), self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        def ms(ns):
+            return round(ns / 1e6, 4)
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total_ns / self.count) if self.count else 0.0,
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+            "min_ms": ms(self.min_ns or 0),
+            "max_ms": ms(self.max_ns),
+        }
+
+
+class _NullSpan:
+    """Shared do-nothing span used while instrumentation is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_metrics", "_key", "_start")
+
+    def __init__(self, metrics, key):
+        self._metrics = metrics
+        self._key = key
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.record_ns(self._key[0], self._key[1],
+                                time.perf_counter_ns() - self._start)
+        return False
+
+
+class Instrumentation:
+    """Per-(model, phase) latency histograms"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.__histograms = {}
+        self.__lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def span(self, model, phase):
+        """Context manager timing one phase with perf_counter_ns"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, (model, phase))
+
+    def record_ns(self, model, phase, ns):
+        """Add an externally measured duration"""
+        if not self.enabled:
+            return
+        with self.__lock:
+            histogram = self.__histograms.get((model, phase))
+            if histogram is None:
+                histogram = self.__histograms[(model, phase)] = LatencyHistogram()
+            histogram.record(ns)
+
+    def histogram(self, model, phase):
+        return self.__histograms.get((model, phase))
+
+    def snapshot(self):
+        """{model: {phase: {count, mean_ms, p50_ms, p95_ms, p99_ms, ...}}}"""
+        with self.__lock:
+            items = [(key, histogram.summary()) for key, histogram in self.__histograms.items()]
+        result = {}
+        for (model, phase), summary in sorted(items):
+            result.setdefault(model, {})[phase] = summary
+        return result
+
+    def to_json(self, indent=2):
+        return json.dumps({"enabled": self.enabled, "models": self.snapshot()},
+                          indent=indent)
+
+    def reset(self):
+        with self.__lock:
+            self.__histograms.clear()
+
+
+metrics = Instrumentation(enabled=os.environ.get("HIT137_METRICS") == "1")
+
+
+def span(model, phase):
+    """Shortcut for metrics.span()"""
+    return metrics.span(model, phase)
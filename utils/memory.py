@@ -0,0 +1,163 @@
+"""
+Memory Accounting - process RSS, peaks and memory budgets
+Author: Team HIT137
+
+    from utils.memory import MemoryProbe, rss_bytes, format_bytes
+
+    with MemoryProbe() as probe:
+        model.load_model()
+    probe.delta_bytes, probe.peak_delta_bytes
+
+RSS and peak come from /proc on Linux (the kernel's high-water mark is
+reset per probe via /proc/self/clear_refs; peak_rss_bytes() still
+reports the lifetime peak), from psutil when it is installed, and from
+getrusage otherwise. The peak is process-wide: with concurrent work it
+is an upper bound for the probed call.
+
+Budgets (in MB, 0 or unset = unlimited):
+    HIT137_REQUEST_BUDGET_MB  working memory one process() call may use
+"""
+
+import os
+import threading
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class MemoryBudgetError(MemoryError):
+    """A request or model load would exceed its memory budget"""
+
+
+def format_bytes(count):
+    if count is None:
+        return "n/a"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(count) < 1024 or unit == "GB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def rss_bytes():
+    """Current resident set size of this process (None if unknown)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def _high_water_bytes():
+    """The kernel's RSS high-water mark since the last reset"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+_lifetime_peak = 0  # highest high-water mark seen before a reset
+
+
+def peak_rss_bytes():
+    """Peak resident set size over the life of the process"""
+    peak = _high_water_bytes()
+    return None if peak is None else max(peak, _lifetime_peak)
+
+
+def reset_peak():
+    """Reset the kernel's RSS high-water mark; False where unsupported"""
+    global _lifetime_peak
+    _lifetime_peak = max(_lifetime_peak, _high_water_bytes() or 0)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def available_bytes():
+    """Memory the system can still give us without swapping (None if unknown)"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        return None
+
+
+_peak_lock = threading.Lock()
+_active_probes = 0  # the high-water mark is only reset when no probe is running
+
+
+class MemoryProbe:
+    """Context manager measuring RSS growth and peak over a block"""
+
+    def __init__(self):
+        self.before_bytes = None
+        self.delta_bytes = None
+        self.peak_delta_bytes = None
+
+    def __enter__(self):
+        global _active_probes
+        self.before_bytes = rss_bytes()
+        with _peak_lock:
+            self.__peak_reset = _active_probes == 0 and reset_peak()
+            _active_probes += 1
+        self.__peak_before = _high_water_bytes()
+        return self
+
+    def __exit__(self, *exc):
+        global _active_probes
+        with _peak_lock:
+            _active_probes -= 1
+        after = rss_bytes()
+        if self.before_bytes is None or after is None:
+            return False
+        self.delta_bytes = after - self.before_bytes
+        peak = _high_water_bytes()
+        if self.__peak_reset and peak is not None:
+            self.peak_delta_bytes = max(peak - self.before_bytes, self.delta_bytes, 0)
+        elif peak is not None and peak > self.__peak_before:
+            # without a reset the high-water mark only shows new records
+            self.peak_delta_bytes = peak - self.before_bytes
+        else:
+            self.peak_delta_bytes = max(self.delta_bytes, 0)
+        return False
+
+
+def _budget_from_env(name):
+    megabytes = os.environ.get(name)
+    return int(float(megabytes) * 1024 * 1024) if megabytes and float(megabytes) > 0 else None
+
+
+_request_budget = _budget_from_env("HIT137_REQUEST_BUDGET_MB")
+
+
+def request_budget_bytes():
+    """Default working-memory budget of one request (None = unlimited)"""
+    return _request_budget
+
+
+def set_request_budget(budget_bytes):
+    global _request_budget
+    _request_budget = budget_bytes or None
@@ -0,0 +1,90 @@
+"""
+Startup Profiling - phase timings and an import-time breakdown
+Author: Team HIT137
+
+Usage:
+    python main.py --startup-report
+    python -m utils.startup gui.main_window models.sentiment_model
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("torch", "transformers", "PIL")
+
+
+class StartupTimer:
+    """Records named phases relative to when the timer was created"""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._marks = []
+
+    def mark(self, phase):
+        """Remember how long it took to reach this phase"""
+        elapsed = time.perf_counter() - self._start
+        self._marks.append((phase, elapsed))
+        return elapsed
+
+    def report(self):
+        """Text report of the recorded phases"""
+        lines = ["Startup phases:"]
+        previous = 0.0
+        for phase, elapsed in self._marks:
+            lines.append(f"  {phase:<32} {elapsed * 1000:>9.1f} ms"
+                         f"  (+{(elapsed - previous) * 1000:.1f} ms)")
+            previous = elapsed
+        loaded = heavy_modules_loaded()
+        lines.append("  heavy modules imported so far: "
+                     + (", ".join(loaded) if loaded else "none"))
+        return "\n".join(lines)
+
+
+def heavy_modules_loaded():
+    """Which of the slow third-party packages are already imported"""
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def import_time_breakdown(module, top=15, cwd=None):
+    """
+    Import a module in a fresh interpreter with -X importtime and return
+    (total_us, rows) where rows are (cumulative_us, self_us, name) sorted
+    by cumulative time, largest first
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+        cwd=cwd or os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name[1:].rstrip()))
+    # nested imports are indented, so top-level rows add up to the total
+    total = sum(row[0] for row in rows if not row[2].startswith(" "))
+    rows.sort(reverse=True)
+    return total, rows[:top]
+
+
+def format_import_breakdown(module, top=15, cwd=None):
+    """Text table in the style of python -X importtime"""
+    total, rows = import_time_breakdown(module, top, cwd)
+    lines = [f"Import time for {module}: {total / 1000:.1f} ms",
+             f"  {'cumulative':>12} {'self':>10}  module"]
+    for cumulative_us, self_us, name in rows:
+        lines.append(f"  {cumulative_us / 1000:>9.1f} ms {self_us / 1000:>7.1f} ms  {name}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    modules = (argv if argv is not None else sys.argv[1:]) or ["gui.main_window"]
+    for module in modules:
+        print(format_import_breakdown(module))
+        print()
+
+
+if __name__ == "__main__":
+    main()